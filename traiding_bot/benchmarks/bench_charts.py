@@ -0,0 +1,20 @@
+"""
+Chart figure construction (Plotly objects only; nothing is rendered).
+"""
+
+from benchmarks.synthetic import synthetic_frame
+from core.chart_rendering import build_fibonacci_figure
+from core.plot_fibonacci import FibonacciPlotter
+
+
+class FibonacciFigure:
+    params = [[1_000, 100_000, 1_000_000]]
+    param_names = ["n_bars"]
+
+    def setup(self, n_bars):
+        plotter = FibonacciPlotter(limit=n_bars)
+        self.analysis = plotter.analyze(synthetic_frame(n_bars))
+
+    def time_build_fibonacci_figure(self, n_bars):
+        build_fibonacci_figure(self.analysis.data, self.analysis.levels, markers=self.analysis.markers,
+                               older_levels=self.analysis.older_levels)
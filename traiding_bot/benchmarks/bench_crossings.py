@@ -0,0 +1,42 @@
+"""
+Crossing detection and the breakout analysis behind FibonacciPlotter.plot.
+"""
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_frame, synthetic_records
+from core.crossings import detect_crossings, detect_threshold_breaches
+from core.fibonacci_utils import calculate_fibonacci_levels, rolling_fibonacci_levels
+from core.plot_fibonacci import FibonacciPlotter
+
+
+class Crossings:
+    params = [[1_000, 100_000, 1_000_000, 10_000_000]]
+    param_names = ["n_bars"]
+
+    def setup(self, n_bars):
+        records = synthetic_records(n_bars)
+        self.close = np.ascontiguousarray(records['Close'])
+        self.levels = list(calculate_fibonacci_levels(float(records['High'].max()), float(records['Low'].min())).values())
+        self.grid = rolling_fibonacci_levels(records['High'], records['Low'], 100)
+
+    def time_detect_crossings_fixed(self, n_bars):
+        detect_crossings(self.close, self.levels)
+
+    def time_detect_crossings_rolling(self, n_bars):
+        detect_crossings(self.close, self.grid)
+
+    def time_threshold_breaches(self, n_bars):
+        detect_threshold_breaches(self.close, upper=110.0, lower=90.0)
+
+
+class BreakoutAnalysis:
+    params = [[1_000, 100_000, 1_000_000]]
+    param_names = ["n_bars"]
+
+    def setup(self, n_bars):
+        self.frame = synthetic_frame(n_bars)
+        self.plotter = FibonacciPlotter(limit=n_bars)
+
+    def time_analyze(self, n_bars):
+        self.plotter.analyze(self.frame)
@@ -0,0 +1,80 @@
+"""
+Data layer and scanning with the network replaced by a fake exchange: candle loading
+through the cache (cold and warm), resampling and watchlist scans.
+"""
+
+import time
+
+from benchmarks.fixtures import install_fake_exchange, remove_temporary_dirs, temporary_cache
+from benchmarks.synthetic import synthetic_universe
+from core.data_sources import load_candles
+from core.signal_generator import StaticProvider, scan_watchlist
+from core.timeframes import timeframe_to_ms
+
+
+def _recent_universe(n_symbols, n_bars, timeframe="1h"):
+    # Candles ending now, so cache freshness and 'latest N bars' requests behave like live data
+    tf_ms = timeframe_to_ms(timeframe)
+    start = (int(time.time() * 1000) // tf_ms - n_bars + 1) * tf_ms
+    return synthetic_universe(n_symbols, n_bars, timeframe=timeframe, start=start)
+
+
+class CandleLoading:
+    params = [[1, 100]]
+    param_names = ["n_symbols"]
+
+    def setup(self, n_symbols):
+        self.universe = _recent_universe(n_symbols, 5_000)
+        install_fake_exchange({(symbol, "1h"): records for symbol, records in self.universe.items()})
+        self.warm = temporary_cache()
+        for symbol in self.universe:
+            load_candles("binance", symbol, "1h", limit=2_000, cache=self.warm)
+
+    def teardown(self, n_symbols):
+        remove_temporary_dirs()
+
+    def time_load_candles_warm(self, n_symbols):
+        for symbol in self.universe:
+            load_candles("binance", symbol, "1h", limit=2_000, cache=self.warm)
+
+    def time_load_candles_resampled_4h(self, n_symbols):
+        for symbol in self.universe:
+            load_candles("binance", symbol, "4h", limit=400, cache=self.warm)
+
+
+class CandleLoadingCold:
+    params = [[1, 100]]
+    param_names = ["n_symbols"]
+    # One call per sample with setup / teardown around each (asv semantics), so every
+    # sample starts from an empty cache directory that is removed afterwards
+    number = 1
+
+    def setup(self, n_symbols):
+        self.universe = _recent_universe(n_symbols, 5_000)
+        install_fake_exchange({(symbol, "1h"): records for symbol, records in self.universe.items()})
+        self.cache = temporary_cache()
+
+    def teardown(self, n_symbols):
+        remove_temporary_dirs()
+
+    def time_load_candles_cold(self, n_symbols):
+        for symbol in self.universe:
+            load_candles("binance", symbol, "1h", limit=2_000, cache=self.cache)
+
+
+class WatchlistScan:
+    params = [[1, 100, 5_000]]
+    param_names = ["n_symbols"]
+
+    def setup(self, n_symbols):
+        indicators = {}
+        self.watchlist = []
+        for i in range(n_symbols):
+            symbol = f"SYM{i:04d}USDT"
+            indicators[(f"BINANCE:{symbol}", "1h")] = {"high": 3.3 + i % 7, "low": 2.9}
+            indicators[(f"BINANCE:{symbol}", "1m")] = {"close": 3.0 + (i % 11) / 10}
+            self.watchlist.append((symbol, "BINANCE", "crypto"))
+        self.provider = StaticProvider(indicators)
+
+    def time_scan_watchlist(self, n_symbols):
+        scan_watchlist(self.watchlist, provider=self.provider)
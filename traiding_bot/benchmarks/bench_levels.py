@@ -0,0 +1,53 @@
+"""
+Level computation: single and vectorized Fibonacci grids, rolling grids, ZigZag pivots
+and LevelIndex queries.
+"""
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_records
+from core.fibonacci_utils import calculate_fibonacci_levels, fibonacci_level_grid, rolling_fibonacci_levels
+from core.level_index import LevelIndex
+from core.pivots import swing_grids, zigzag_pivots
+
+
+class ScalarLevels:
+    def time_calculate_fibonacci_levels(self):
+        calculate_fibonacci_levels(3.3, 2.9)
+
+
+class LevelGrids:
+    params = [[1_000, 100_000, 1_000_000, 10_000_000]]
+    param_names = ["n_bars"]
+
+    def setup(self, n_bars):
+        records = synthetic_records(n_bars)
+        self.high = np.ascontiguousarray(records['High'])
+        self.low = np.ascontiguousarray(records['Low'])
+
+    def time_fibonacci_level_grid(self, n_bars):
+        fibonacci_level_grid(self.high, self.low)
+
+    def time_rolling_fibonacci_levels(self, n_bars):
+        rolling_fibonacci_levels(self.high, self.low, 100)
+
+    def time_zigzag_pivots(self, n_bars):
+        zigzag_pivots(self.high, self.low, 0.05)
+
+
+class LevelIndexQueries:
+    params = [[1_000, 100_000, 1_000_000]]
+    param_names = ["n_prices"]
+
+    def setup(self, n_prices):
+        records = synthetic_records(50_000)
+        grids = swing_grids(zigzag_pivots(records['High'], records['Low'], 0.02))
+        self.index = LevelIndex.from_grids(grids.levels)
+        self.prices = synthetic_records(n_prices, seed=1)['Close']
+        self.tolerances = self.prices * 0.003
+
+    def time_query_many(self, n_prices):
+        self.index.query_many(self.prices, self.tolerances)
+
+    def time_confluence(self, n_prices):
+        self.index.confluence(self.prices, self.tolerances)
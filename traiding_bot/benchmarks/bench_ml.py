@@ -0,0 +1,69 @@
+"""
+ML hot paths: feature building, training, and single / batch inference.
+"""
+
+from benchmarks.fixtures import install_model, remove_temporary_dirs, train_fixture_model
+from benchmarks.synthetic import synthetic_frame
+from ml.features import compute_feature_matrix
+from ml.model import predict_fibo_signal, predict_many
+from ml.trainer import build_features, walk_forward_search
+
+
+class Features:
+    params = [[1_000, 100_000, 1_000_000]]
+    param_names = ["n_bars"]
+
+    def setup(self, n_bars):
+        self.frame = synthetic_frame(n_bars)
+        self.high = self.frame["High"].to_numpy()
+        self.low = self.frame["Low"].to_numpy()
+        self.close = self.frame["Close"].to_numpy()
+
+    def time_compute_feature_matrix(self, n_bars):
+        compute_feature_matrix(self.high, self.low, self.close)
+
+    def time_build_features(self, n_bars):
+        build_features(self.frame)
+
+
+class Training:
+    params = [[1_000, 10_000, 100_000]]
+    param_names = ["n_bars"]
+    repeat = 1
+    # One small candidate keeps the search cost proportional to the data, not the grid
+    param_grid = {"n_estimators": [20], "max_depth": [8], "min_samples_leaf": [20]}
+
+    def setup(self, n_bars):
+        self.X, self.y = build_features(synthetic_frame(n_bars))
+
+    def time_walk_forward_search(self, n_bars):
+        walk_forward_search(self.X, self.y, param_grid=self.param_grid, n_splits=3, n_jobs=1)
+
+
+class InferenceSingle:
+    def setup(self):
+        install_model(train_fixture_model())
+        self.frame = synthetic_frame(1_000)
+        predict_fibo_signal(self.frame)   # Load the model outside the timed call
+
+    def teardown(self):
+        remove_temporary_dirs()
+
+    def time_predict_fibo_signal(self):
+        predict_fibo_signal(self.frame)
+
+
+class InferenceBatch:
+    params = [[1, 100, 5_000]]
+    param_names = ["n_symbols"]
+
+    def setup(self, n_symbols):
+        install_model(train_fixture_model())
+        self.frames = [synthetic_frame(600, seed) for seed in range(n_symbols)]
+        predict_many(self.frames[:1])
+
+    def teardown(self, n_symbols):
+        remove_temporary_dirs()
+
+    def time_predict_many(self, n_symbols):
+        predict_many(self.frames, proba=True)
@@ -0,0 +1,127 @@
+"""
+Fixtures that replace the network in benchmarks: temporary candle caches, a fake exchange
+serving synthetic or recorded candles, and a small trained model.
+
+Temporary directories are tracked and removed by remove_temporary_dirs(), which benchmark
+classes call from `teardown` (and which also runs at interpreter exit).
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_frame
+from core.candle_cache import CandleCache
+from core.exchange_clients import ClientRegistry, FakeExchangeTransport
+
+
+_temporary_dirs = []
+
+
+def temporary_dir(prefix: str = "fibobot-bench-") -> str:
+    """
+    Creates a temporary directory that remove_temporary_dirs() deletes.
+    """
+    path = tempfile.mkdtemp(prefix=prefix)
+    _temporary_dirs.append(path)
+    return path
+
+
+def remove_temporary_dirs():
+    """
+    Deletes every directory created by temporary_dir() so far.
+    """
+    while _temporary_dirs:
+        shutil.rmtree(_temporary_dirs.pop(), ignore_errors=True)
+
+
+atexit.register(remove_temporary_dirs)
+
+
+def temporary_cache(refresh_interval: float = 1e9) -> CandleCache:
+    """
+    Empty candle cache in a temporary directory. Stored series count as fresh for
+    `refresh_interval` seconds, so warm reads never refetch.
+    """
+    return CandleCache(temporary_dir(), refresh_interval=refresh_interval)
+
+
+def fake_exchange(series: Dict[Tuple[str, str], np.ndarray], max_limit: int = 1000) -> FakeExchangeTransport:
+    """
+    Fake transport serving CANDLE_DTYPE records keyed by (symbol, timeframe).
+    """
+    candles = {key: np.column_stack([records[name] for name in records.dtype.names])
+               for key, records in series.items()}
+    return FakeExchangeTransport(candles, max_limit=max_limit)
+
+
+def install_fake_exchange(series: Dict[Tuple[str, str], np.ndarray], exchange_id: str = "binance",
+                          registry: Optional[ClientRegistry] = None) -> FakeExchangeTransport:
+    """
+    Registers a fake transport for `exchange_id` (in the shared registry by default).
+    """
+    from core.exchange_clients import get_client_registry
+
+    transport = fake_exchange(series)
+    (registry or get_client_registry()).register(exchange_id, transport)
+    return transport
+
+
+# --- Recorded Fixtures ---
+
+def record_fixture(path: str, source: str, symbols: Iterable[str], timeframe: str,
+                   cache: Optional[CandleCache] = None):
+    """
+    Saves stored series from a candle cache (e.g. after a real fetch) to one .npz file,
+    so benchmarks can replay real market data without network access.
+    """
+    from core.candle_cache import get_default_cache
+
+    cache = cache or get_default_cache()
+    arrays = {f"{symbol}|{timeframe}": np.asarray(cache.read(source, symbol, timeframe)) for symbol in symbols}
+    np.savez_compressed(path, **arrays)
+
+
+def load_fixture(path: str) -> Dict[Tuple[str, str], np.ndarray]:
+    """
+    Loads a record_fixture() file as (symbol, timeframe) -> CANDLE_DTYPE records.
+    """
+    with np.load(path) as data:
+        return {tuple(key.split("|", 1)): data[key] for key in data.files}
+
+
+# --- Model ---
+
+def train_fixture_model(path: Optional[str] = None, n_bars: int = 5_000, seed: int = 0):
+    """
+    Trains a small model on synthetic candles, stores it like ml/trainer.py does and
+    returns a ModelRegistry pointing at it.
+    """
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+
+    from ml.features import FEATURE_COLUMNS, FEATURE_WINDOW, TARGET_HORIZON
+    from ml.model import ModelRegistry
+    from ml.trainer import build_features
+
+    X, y = build_features(synthetic_frame(n_bars, seed))
+    model = RandomForestClassifier(n_estimators=100, max_depth=8, random_state=0, n_jobs=1).fit(X, y)
+
+    path = path or os.path.join(temporary_dir(prefix="fibobot-model-"), "fibo_model.pkl")
+    joblib.dump({"model": model, "feature_columns": FEATURE_COLUMNS, "feature_window": FEATURE_WINDOW,
+                 "target_horizon": TARGET_HORIZON}, path)
+    return ModelRegistry(path)
+
+
+def install_model(registry):
+    """
+    Makes `registry` the process-wide model registry used by ml.model.predict_many.
+    """
+    import ml.model
+
+    ml.model._registry = registry
+    return registry
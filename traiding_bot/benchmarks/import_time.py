@@ -0,0 +1,122 @@
+"""
+⏱️ Import-Time Budget Check
+
+Imports each core module in a fresh interpreter with `python -X importtime` and checks
+that (a) its cumulative import time stays within budget and (b) it does not pull in
+heavy UI / network / ML dependencies at import time. Worker processes and cold starts
+pay this cost on every spawn, so a regression here slows every pooled run.
+
+Usage (from the traiding_bot directory):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --scale 2      # Slower machine: double every budget
+
+Exit codes:
+    0 - every module is within budget
+    1 - at least one budget was exceeded or a forbidden module was imported
+
+Author: Elinor Srur
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# Never needed to import compute / data code; loaded lazily where actually used
+FORBIDDEN = ("streamlit", "plotly", "ccxt", "yfinance", "tradingview_ta", "sklearn")
+
+# Module -> (budget in ms, extra forbidden modules)
+BUDGETS = {
+    "core.timeframes": (50, ("numpy", "pandas")),
+    "core.rate_limit": (50, ("numpy", "pandas")),
+    "core.metrics": (50, ("numpy", "pandas")),
+    "core.fibonacci_utils": (300, ("pandas",)),
+    "core.crossings": (300, ("pandas",)),
+    "core.candle_cache": (300, ("pandas",)),
+    "core.streaming": (300, ("pandas",)),
+    "core.signal_generator": (300, ("pandas",)),
+    "core.exchange_clients": (300, ("pandas",)),
+    "core.pivots": (300, ("pandas",)),
+    "core.level_index": (300, ("pandas",)),
+    "core.live_feed": (300, ("pandas", "websockets")),
+    "core.ring_store": (300, ("pandas",)),
+    "core.result_cache": (300, ("pandas",)),
+    "core.data_sources": (1200, ()),
+    "core.resample": (1200, ()),
+    "core.chart_rendering": (1200, ()),
+    "core.plot_fibonacci": (1200, ()),
+    "core.stock_plotter": (1200, ()),
+    "core.backtest": (1200, ()),
+    "ml.features": (300, ("pandas",)),
+    "ml.model": (1500, ()),
+}
+
+# "import time: self [us] | cumulative | imported package"
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module):
+    """
+    Imports a module in a fresh interpreter.
+
+    Returns:
+        tuple: (cumulative import time in ms, set of every module imported on the way).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+
+    cumulative_us, imported = None, set()
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        imported.add(name)
+        if name == module:
+            cumulative_us = int(match.group(2))
+    return (cumulative_us or 0) / 1000, imported
+
+
+def check_budgets(budgets=BUDGETS, scale=1.0):
+    """
+    Measures every module in `budgets`.
+
+    Returns:
+        list: (module, ms, budget_ms, forbidden modules that were imported) per module.
+    """
+    rows = []
+    for module, (budget_ms, extra_forbidden) in budgets.items():
+        ms, imported = measure_import(module)
+        banned = [name for name in FORBIDDEN + tuple(extra_forbidden)
+                  if any(mod == name or mod.startswith(name + ".") for mod in imported)]
+        rows.append((module, ms, budget_ms * scale, banned))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check per-module import-time budgets.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (slow machines)")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for module, ms, budget_ms, banned in check_budgets(scale=args.scale):
+        ok = ms <= budget_ms and not banned
+        failed += not ok
+        note = f"  imports {', '.join(banned)}" if banned else ""
+        print(f"{'✅' if ok else '❌'} {module:<24} {ms:8.1f} ms / {budget_ms:6.0f} ms{note}")
+
+    if failed:
+        print(f"❌ {failed} module(s) over budget.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
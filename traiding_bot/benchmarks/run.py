@@ -0,0 +1,255 @@
+"""
+⏱️ Benchmark Runner
+
+Runs the asv-style benchmark classes in benchmarks/bench_*.py and writes the timings as a
+JSON baseline, which can then be compared against another run (e.g. a previous commit).
+
+A benchmark class may define `params` / `param_names` (one run per combination),
+`setup(*params)`, `teardown(*params)` and any number of `time_*` methods; `repeat` sets
+the number of timing repeats. Setting `number` fixes the calls per sample and, as in asv,
+runs teardown / setup around every sample (e.g. for benchmarks that need fresh state).
+The same classes run unchanged under asv.
+
+Usage (from the traiding_bot directory):
+    python -m benchmarks.run                                  # Up to 1M bars / 500 symbols
+    python -m benchmarks.run --quick                          # Up to 100k bars / 100 symbols
+    python -m benchmarks.run --full                           # Every size (10M bars, 5k symbols)
+    python -m benchmarks.run --bench "crossings|levels"       # Regex on benchmark names
+    python -m benchmarks.run --compare benchmarks/results/abc1234.json --threshold 1.2
+
+Exit codes:
+    0 - success (no regression beyond --threshold when comparing)
+    1 - at least one benchmark regressed or failed
+
+Author: Elinor Srur
+"""
+
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import timeit
+
+BENCHMARK_MODULES = ["bench_levels", "bench_crossings", "bench_ml", "bench_charts", "bench_data"]
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Size parameters that the --quick / default / --full presets limit
+SIZE_LIMITS = {
+    "quick": {"n_bars": 100_000, "n_prices": 100_000, "n_symbols": 100},
+    "default": {"n_bars": 1_000_000, "n_prices": 1_000_000, "n_symbols": 500},
+    "full": {},
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _machine_info():
+    import numpy as np
+    import pandas as pd
+
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "processor": platform.processor(), "cpu_count": os.cpu_count(),
+            "numpy": np.__version__, "pandas": pd.__version__}
+
+
+def discover(pattern=None):
+    """
+    Yields (name, class, method name) for every time_* benchmark matching `pattern`.
+    """
+    regex = re.compile(pattern) if pattern else None
+    for module_name in BENCHMARK_MODULES:
+        module = importlib.import_module(f"benchmarks.{module_name}")
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for method in sorted(m for m in dir(cls) if m.startswith("time_")):
+                name = f"{module_name}.{class_name}.{method}"
+                if regex is None or regex.search(name):
+                    yield name, cls, method
+
+
+def _param_sets(cls, limits):
+    params = getattr(cls, "params", None)
+    if not params:
+        return [()]
+    names = getattr(cls, "param_names", [f"param{i}" for i in range(len(params))])
+    combos = []
+    for combo in itertools.product(*params):
+        if all(value <= limits.get(name, value) for name, value in zip(names, combo)):
+            combos.append(combo)
+    return combos
+
+
+def time_call(fn, repeat=5, min_time=0.2, number=None, reset=None):
+    """
+    Times fn() like timeit: calls per sample are chosen so one sample takes >= min_time
+    (a single call for slow functions). Returns (per-call seconds of every sample, calls per sample).
+
+    With a fixed `number`, `reset()` runs untimed before the warm-up and every sample.
+    """
+    timer = timeit.Timer(fn)
+    if number is not None:
+        samples = []
+        for i in range(repeat + 1):   # The first round is the warm-up
+            if reset is not None:
+                reset()
+            elapsed = timer.timeit(number=number)
+            if i:
+                samples.append(elapsed / number)
+        return samples, number
+
+    start = time.perf_counter()
+    fn()   # Warm-up, which also calibrates the number of calls
+    elapsed = time.perf_counter() - start
+    if elapsed >= min_time:
+        # Slow call: the warm-up already is a valid single-call sample
+        return [elapsed] + timer.repeat(repeat=repeat - 1, number=1), 1
+    number = timer.autorange()[0]
+    return [t / number for t in timer.repeat(repeat=repeat, number=number)], number
+
+
+def run(pattern=None, limits=None, repeat=5, verbose=True):
+    """
+    Runs every matching benchmark and returns the result rows.
+    """
+    limits = SIZE_LIMITS["default"] if limits is None else limits
+    by_class = {}
+    for name, cls, method in discover(pattern):
+        by_class.setdefault(cls, []).append((name, method))
+
+    results = []
+    for cls, methods in by_class.items():
+        names = getattr(cls, "param_names", [])
+        for combo in _param_sets(cls, limits):
+            params = dict(zip(names, combo))
+            instance = cls()
+            try:
+                if hasattr(instance, "setup"):
+                    instance.setup(*combo)
+            except NotImplementedError:
+                continue   # asv convention: skip this combination
+            except Exception as e:
+                for name, _ in methods:
+                    results.append({"name": name, "params": params, "error": f"setup: {e}"})
+                continue
+
+            reset = None
+            if getattr(cls, "number", None) is not None:
+                def reset():
+                    if hasattr(instance, "teardown"):
+                        instance.teardown(*combo)
+                    instance.setup(*combo)
+
+            for name, method in methods:
+                fn = getattr(instance, method)
+                try:
+                    samples, number = time_call(lambda: fn(*combo), repeat=getattr(cls, "repeat", repeat),
+                                                number=getattr(cls, "number", None), reset=reset)
+                except Exception as e:
+                    results.append({"name": name, "params": params, "error": str(e)})
+                    if verbose:
+                        print(f"❌ {name} {params}: {e}")
+                    continue
+                samples.sort()
+                row = {"name": name, "params": params, "min": samples[0],
+                       "median": samples[len(samples) // 2], "max": samples[-1],
+                       "repeat": len(samples), "number": number}
+                results.append(row)
+                if verbose:
+                    print(f"  {name:<60} {_format_params(params):<22} {_format_seconds(row['median'])}")
+
+            if hasattr(instance, "teardown"):
+                instance.teardown(*combo)
+    return results
+
+
+def _format_params(params):
+    return ", ".join(f"{k}={v:,}" if isinstance(v, int) else f"{k}={v}" for k, v in params.items())
+
+
+def _format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def _key(row):
+    return row["name"], json.dumps(row["params"], sort_keys=True)
+
+
+def compare(baseline, current, threshold=1.2):
+    """
+    Compares median timings of two result sets.
+
+    Returns:
+        list: (name, params, baseline median, current median, ratio) for benchmarks in both,
+            sorted by descending ratio; a ratio above `threshold` is a regression.
+    """
+    base = {_key(row): row for row in baseline if "median" in row}
+    rows = []
+    for row in current:
+        old = base.get(_key(row))
+        if old is not None and "median" in row:
+            rows.append((row["name"], row["params"], old["median"], row["median"], row["median"] / old["median"]))
+    return sorted(rows, key=lambda r: r[-1], reverse=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and record a JSON baseline.")
+    preset = parser.add_mutually_exclusive_group()
+    preset.add_argument("--quick", action="store_true", help="Small sizes only")
+    preset.add_argument("--full", action="store_true", help="Every size, up to 10M bars and 5k symbols")
+    parser.add_argument("--bench", default=None, help="Regex selecting benchmark names")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing samples per benchmark")
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio counted as a regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    limits = SIZE_LIMITS["quick" if args.quick else "full" if args.full else "default"]
+
+    commit = _git_commit()
+    results = run(args.bench, limits, repeat=args.repeat)
+    report = {"commit": commit, "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+              "machine": _machine_info(), "limits": limits, "results": results}
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ {len(results)} results written to {output}")
+
+    failed = sum(1 for row in results if "error" in row)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\n📊 Compared with {baseline.get('commit')} (ratio = current / baseline median)")
+        for name, params, old, new, ratio in compare(baseline["results"], results, args.threshold):
+            flag = "❌" if ratio > args.threshold else "✅" if ratio >= 1 / args.threshold else "🚀"
+            print(f"{flag} {name:<60} {_format_params(params):<22} {ratio:6.2f}x "
+                  f"({_format_seconds(old).strip()} -> {_format_seconds(new).strip()})")
+            failed += ratio > args.threshold
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Vectorized backtesting of the Fibonacci breakout / proximity strategies.
+
+Strategies replay stored OHLCV arrays with point-in-time level grids (each bar only sees
+the swing window of the bars before it). Positions and PnL are computed with array
+operations, and parameter sweeps fan out across a process pool, one task per symbol.
+
+Usage:
+    python -m core.backtest --symbols XRP/USDT BTC/USDT --timeframe 1h --output results.csv
+"""
+
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.candle_cache import CandleCache, DEFAULT_CACHE_DIR
+from core.crossings import detect_crossings
+from core.fibonacci_utils import FIB_INDEX, FIB_LABELS, rolling_fibonacci_levels
+from core.timeframes import timeframe_to_ms
+
+# Named subsets of the Fibonacci grid that can be swept
+RATIO_SETS = {
+    "all": FIB_LABELS,
+    "inner": ("23.6%", "38.2%", "50.0%", "61.8%", "78.6%"),
+    "golden": ("38.2%", "50.0%", "61.8%"),
+    "deep": ("61.8%", "78.6%"),
+}
+
+# Default sweep grid (the tolerance default matches generate_fibonacci_signal)
+DEFAULT_PARAMS = {
+    "strategy": ["breakout", "proximity"],
+    "window": [50, 100, 200],
+    "ratio_set": ["all", "golden"],
+    "tolerance": [0.001, 0.003, 0.005],
+    "holding": [1, 3, 6, 12],
+}
+
+
+# --- Signals ---
+
+def point_in_time_grid(high, low, window: int) -> np.ndarray:
+    """
+    Rolling Fibonacci grid where row i is built from bars [i - window, i - 1] only.
+    """
+    grid = rolling_fibonacci_levels(high, low, window)
+    shifted = np.full_like(grid, np.nan)
+    shifted[1:] = grid[:-1]
+    return shifted
+
+
+def breakout_signals(close: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """
+    Net direction of level crossings per bar: +1 (bullish), -1 (bearish) or 0.
+    """
+    events = detect_crossings(close, grid)
+    signals = np.zeros(len(close), dtype=np.int64)
+    np.add.at(signals, events.index, events.direction.astype(np.int64))
+    return np.sign(signals)
+
+
+def proximity_signals(close: np.ndarray, grid: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    +1 when the close sits within the tolerance band just above a level (support),
+    -1 when just below one (resistance), 0 otherwise.
+    """
+    distance = close[:, None] - grid
+    near = np.abs(distance) < (tolerance * close)[:, None]
+    above = (near & (distance >= 0)).any(axis=1)
+    below = (near & (distance < 0)).any(axis=1)
+    return above.astype(np.int64) - below.astype(np.int64)
+
+
+def hold_positions(signals: np.ndarray, holding: int) -> np.ndarray:
+    """
+    Turns entry signals into positions held for `holding` bars (net direction of active entries).
+    """
+    cumulative = np.concatenate([[0], np.cumsum(signals)])
+    active = cumulative[1:] - cumulative[np.maximum(np.arange(1, len(cumulative)) - holding, 0)]
+    return np.sign(active).astype(np.float64)
+
+
+# --- PnL ---
+
+def evaluate_positions(close: np.ndarray, positions: np.ndarray, fee: float = 0.0,
+                       periods_per_year: float = 24 * 365) -> Dict[str, float]:
+    """
+    Computes performance statistics for a position series.
+
+    The position decided at the close of bar t earns the return of bar t + 1.
+
+    Args:
+        close (np.ndarray): Close prices.
+        positions (np.ndarray): Position per bar in [-1, 1].
+        fee (float): Cost per unit of position change (fraction of notional).
+        periods_per_year (float): Bars per year, used to annualize the Sharpe ratio.
+
+    Returns:
+        dict: total_return, sharpe, max_drawdown, trades and exposure.
+    """
+    bar_returns = np.zeros(len(close))
+    bar_returns[1:] = close[1:] / close[:-1] - 1
+
+    held = np.zeros(len(close))
+    held[1:] = positions[:-1]
+    turnover = np.abs(np.diff(positions, prepend=0.0))
+    strategy_returns = held * bar_returns - fee * turnover
+
+    equity = np.cumprod(1 + strategy_returns)
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    std = strategy_returns.std()
+
+    entries = (positions != 0) & (np.concatenate([[0.0], positions[:-1]]) != positions)
+    return {
+        "total_return": float(equity[-1] - 1) if len(equity) else 0.0,
+        "sharpe": float(strategy_returns.mean() / std * np.sqrt(periods_per_year)) if std > 0 else 0.0,
+        "max_drawdown": float(drawdown.min()) if len(drawdown) else 0.0,
+        "trades": int(entries.sum()),
+        "exposure": float((positions != 0).mean()) if len(positions) else 0.0,
+    }
+
+
+def backtest(high, low, close, strategy: str = "breakout", window: int = 100, ratio_set: str = "all",
+             tolerance: float = 0.003, holding: int = 3, fee: float = 0.0,
+             periods_per_year: float = 24 * 365) -> Dict[str, float]:
+    """
+    Backtests a single parameter combination on one series.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    grid = point_in_time_grid(high, low, window)[:, [FIB_INDEX[label] for label in RATIO_SETS[ratio_set]]]
+    if strategy == "breakout":
+        signals = breakout_signals(close, grid)
+    elif strategy == "proximity":
+        signals = proximity_signals(close, grid, tolerance)
+    else:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    return evaluate_positions(close, hold_positions(signals, holding), fee=fee, periods_per_year=periods_per_year)
+
+
+# --- Parameter Sweeps ---
+
+def iter_param_grid(params: Dict[str, Iterable]) -> Iterable[dict]:
+    """
+    Expands a dict of parameter lists into combinations. Tolerance only matters for the
+    proximity strategy, so breakout combinations are not repeated per tolerance.
+    """
+    keys = list(params)
+    seen = set()
+    for values in itertools.product(*(params[key] for key in keys)):
+        combo = dict(zip(keys, values))
+        if combo.get("strategy") == "breakout":
+            combo["tolerance"] = None
+        key = tuple(sorted(combo.items(), key=lambda item: item[0]))
+        if key not in seen:
+            seen.add(key)
+            yield combo
+
+
+def sweep_series(symbol: str, high, low, close, params: Dict[str, Iterable], fee: float = 0.0,
+                 periods_per_year: float = 24 * 365) -> List[dict]:
+    """
+    Runs every parameter combination on one series, reusing grids and signals between combinations.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    grids, signal_cache, rows = {}, {}, []
+
+    for combo in iter_param_grid(params):
+        window, ratio_set = combo["window"], combo["ratio_set"]
+        if window not in grids:
+            grids[window] = point_in_time_grid(high, low, window)
+
+        signal_key = (combo["strategy"], window, ratio_set, combo["tolerance"])
+        if signal_key not in signal_cache:
+            grid = grids[window][:, [FIB_INDEX[label] for label in RATIO_SETS[ratio_set]]]
+            if combo["strategy"] == "breakout":
+                signal_cache[signal_key] = breakout_signals(close, grid)
+            else:
+                signal_cache[signal_key] = proximity_signals(close, grid, combo["tolerance"])
+
+        positions = hold_positions(signal_cache[signal_key], combo["holding"])
+        stats = evaluate_positions(close, positions, fee=fee, periods_per_year=periods_per_year)
+        rows.append({"symbol": symbol, **combo, **stats})
+    return rows
+
+
+def _sweep_cached_symbol(args) -> List[dict]:
+    # Worker entry point: each process memory-maps its symbol from the candle cache
+    cache_root, source, symbol, timeframe, params, fee = args
+    records = CandleCache(cache_root, offline=True).read(source, symbol, timeframe)
+    if len(records) == 0:
+        return []
+    periods_per_year = timeframe_to_ms("1y") / timeframe_to_ms(timeframe)
+    return sweep_series(symbol, records['High'], records['Low'], records['Close'], params, fee, periods_per_year)
+
+
+def run_sweep(symbols: Iterable[str], params: Optional[Dict[str, Iterable]] = None, source: str = "binance",
+              timeframe: str = "1h", processes: Optional[int] = None, cache_root: str = DEFAULT_CACHE_DIR,
+              fee: float = 0.0) -> pd.DataFrame:
+    """
+    Sweeps the parameter grid over stored candles for many symbols on a process pool.
+
+    Args:
+        symbols (iterable): Symbols already present in the candle cache.
+        params (dict): Parameter name -> list of values (defaults to DEFAULT_PARAMS).
+        source (str): Candle cache source (e.g., 'binance', 'yfinance').
+        timeframe (str): Candle resolution.
+        processes (int): Worker processes (default: CPU count).
+        cache_root (str): Candle cache directory.
+        fee (float): Cost per unit of position change.
+
+    Returns:
+        pd.DataFrame: One row per (symbol, parameter combination) with performance statistics.
+    """
+    params = params or DEFAULT_PARAMS
+    tasks = [(cache_root, source, symbol, timeframe, params, fee) for symbol in symbols]
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for symbol_rows in pool.map(_sweep_cached_symbol, tasks):
+            rows.extend(symbol_rows)
+    return pd.DataFrame(rows)
+
+
+def write_results(results: pd.DataFrame, path: str):
+    """
+    Writes the results table as CSV, or Parquet if the path ends with '.parquet'.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.endswith(".parquet"):
+        results.to_parquet(path, index=False)
+    else:
+        results.to_csv(path, index=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep Fibonacci strategy parameters over cached candles.")
+    parser.add_argument("--symbols", nargs="+", required=True)
+    parser.add_argument("--source", default="binance")
+    parser.add_argument("--timeframe", default="1h")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--fee", type=float, default=0.0)
+    parser.add_argument("--output", default="backtest_results.csv")
+    args = parser.parse_args()
+
+    results = run_sweep(args.symbols, source=args.source, timeframe=args.timeframe,
+                        processes=args.processes, fee=args.fee)
+    write_results(results, args.output)
+    print(f"✅ {len(results)} backtests written to {args.output}")
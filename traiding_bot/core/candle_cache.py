@@ -0,0 +1,249 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING, Callable, Optional
+
+import numpy as np
+
+from core.metrics import CACHE_REQUESTS, inc
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Column layout shared by every OHLCV frame produced by the data loaders
+OHLCV_COLUMNS = ['Timestamp', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+# On-disk record layout: one row per candle, timestamps in epoch milliseconds (UTC)
+CANDLE_DTYPE = np.dtype([
+    ('Timestamp', '<i8'),
+    ('Open', '<f8'),
+    ('High', '<f8'),
+    ('Low', '<f8'),
+    ('Close', '<f8'),
+    ('Volume', '<f8'),
+])
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "FIBOBOT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "candles"),
+)
+
+
+def records_to_frame(records: np.ndarray) -> "pd.DataFrame":
+    """
+    Converts stored candle records into the standard OHLCV DataFrame.
+
+    Args:
+        records (np.ndarray): Structured array with CANDLE_DTYPE fields.
+
+    Returns:
+        pd.DataFrame: Timestamp, Open, High, Low, Close, Volume and a 'Datetime' column.
+    """
+    import pandas as pd
+
+    df = pd.DataFrame({col: np.asarray(records[col]) for col in OHLCV_COLUMNS})
+    df['Datetime'] = pd.to_datetime(df['Timestamp'], unit='ms')
+    return df
+
+
+def frame_to_records(df: "pd.DataFrame") -> np.ndarray:
+    """
+    Converts an OHLCV DataFrame (with a millisecond 'Timestamp' column) into candle records.
+    """
+    records = np.empty(len(df), dtype=CANDLE_DTYPE)
+    for col in OHLCV_COLUMNS:
+        records[col] = df[col].to_numpy()
+    return records
+
+
+def merge_records(stored: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """
+    Merges freshly fetched candles into the stored series.
+
+    Rows are sorted by timestamp and duplicates are resolved in favour of the new rows,
+    so a candle that was still forming at the previous fetch gets overwritten.
+    """
+    if len(stored) == 0:
+        combined = new
+    elif len(new) == 0:
+        return stored
+    else:
+        combined = np.concatenate([stored, new])
+
+    # Stable sort keeps the original order between equal timestamps (stored first, new last)
+    combined = combined[np.argsort(combined['Timestamp'], kind='stable')]
+    ts = combined['Timestamp']
+    keep_last = np.ones(len(combined), dtype=bool)
+    keep_last[:-1] = ts[1:] != ts[:-1]
+    return combined[keep_last]
+
+
+class CandleCache:
+    """
+    On-disk OHLCV store shared by all data loaders.
+
+    Each (source, symbol, timeframe) series lives in its own memory-mappable `.npy`
+    record file plus a small JSON sidecar describing the covered range. Callers pass
+    a fetch function; the cache only asks it for candles newer than the last stored
+    timestamp and serves everything else locally.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, refresh_interval: float = None, offline: bool = None):
+        """
+        Initializes the cache.
+
+        Args:
+            root (str): Directory holding the candle files.
+            refresh_interval (float): Seconds during which a freshly updated series is
+                served without contacting the provider again.
+            offline (bool): If True, never call the fetch function (reproducible runs).
+        """
+        self.root = root
+        if refresh_interval is None:
+            refresh_interval = float(os.environ.get("FIBOBOT_REFRESH_INTERVAL", 30))
+        if offline is None:
+            offline = os.environ.get("FIBOBOT_OFFLINE", "") not in ("", "0")
+        self.refresh_interval = refresh_interval
+        self.offline = offline
+        self._locks = defaultdict(threading.Lock)
+        self._locks_guard = threading.Lock()
+
+    # --- Paths & Locking ---
+    def _base_path(self, source: str, symbol: str, timeframe: str) -> str:
+        safe_symbol = re.sub(r'[^A-Za-z0-9._-]+', '_', symbol)
+        return os.path.join(self.root, source, safe_symbol, timeframe)
+
+    def _lock(self, source: str, symbol: str, timeframe: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks[(source, symbol, timeframe)]
+
+    # --- Raw Access ---
+    def read(self, source: str, symbol: str, timeframe: str, mmap: bool = True) -> np.ndarray:
+        """
+        Returns the stored candle records (memory-mapped by default), or an empty array.
+        """
+        path = self._base_path(source, symbol, timeframe) + '.npy'
+        try:
+            return np.load(path, mmap_mode='r' if mmap else None)
+        except FileNotFoundError:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+
+    def read_meta(self, source: str, symbol: str, timeframe: str) -> dict:
+        path = self._base_path(source, symbol, timeframe) + '.json'
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def write(self, source: str, symbol: str, timeframe: str, records: np.ndarray, meta: dict):
+        """
+        Atomically replaces the stored series and its metadata.
+        """
+        base = self._base_path(source, symbol, timeframe)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+
+        tmp_npy = f"{base}.{os.getpid()}.{threading.get_ident()}.tmp.npy"
+        np.save(tmp_npy, np.ascontiguousarray(records, dtype=CANDLE_DTYPE))
+        os.replace(tmp_npy, base + '.npy')
+
+        tmp_json = f"{base}.{os.getpid()}.{threading.get_ident()}.tmp.json"
+        with open(tmp_json, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_json, base + '.json')
+
+    def last_timestamp(self, source: str, symbol: str, timeframe: str) -> Optional[int]:
+        records = self.read(source, symbol, timeframe)
+        return int(records['Timestamp'][-1]) if len(records) else None
+
+    # --- Incremental Update ---
+    def update(self, source: str, symbol: str, timeframe: str,
+               fetch: Callable[..., "pd.DataFrame"], start: Optional[int] = None) -> np.ndarray:
+        """
+        Brings the stored series up to date and returns all stored records.
+
+        If the stored series already covers `start`, the fetch function is called with the
+        last stored timestamp (inclusive, so the still-forming candle is refreshed).
+        Otherwise only the missing head [start, covered_from) is backfilled, alongside that
+        tail refresh; an empty series (or one without recorded coverage) is fetched from `start`.
+
+        Args:
+            source (str): Data provider name (e.g., 'binance', 'yfinance').
+            symbol (str): Ticker or trading pair.
+            timeframe (str): Candle resolution (e.g., '1h').
+            fetch (Callable): fetch(since_ms, until_ms=None) -> DataFrame with OHLCV_COLUMNS
+                for [since_ms, until_ms), up to now when `until_ms` is None.
+            start (int, optional): Earliest timestamp (ms) the caller needs.
+
+        Returns:
+            np.ndarray: The stored candle records after the update.
+        """
+        with self._lock(source, symbol, timeframe):
+            stored = self.read(source, symbol, timeframe, mmap=False)
+            meta = self.read_meta(source, symbol, timeframe)
+            covered_from = meta.get('covered_from')
+
+            needs_backfill = len(stored) == 0 or (
+                start is not None and (covered_from is None or covered_from > start)
+            )
+
+            if self.offline:
+                inc(CACHE_REQUESTS, cache='candles', result='hit')
+                return stored
+
+            is_fresh = time.time() - meta.get('refreshed_at', 0) < self.refresh_interval
+            if is_fresh and not needs_backfill:
+                inc(CACHE_REQUESTS, cache='candles', result='hit')
+                return stored
+
+            inc(CACHE_REQUESTS, cache='candles', result='miss')
+
+            last = int(stored['Timestamp'][-1]) if len(stored) else None
+            if not needs_backfill:
+                ranges = [(last, None)]
+            elif last is not None and covered_from is not None:
+                # The stored span is contiguous from covered_from: fetch only the gap before it
+                ranges = [(start, covered_from), (last, None)]
+            else:
+                ranges = [(start, None)]
+
+            merged = stored
+            for since, until in ranges:
+                new_df = fetch(since) if until is None else fetch(since, until)
+                if new_df is not None and len(new_df):
+                    merged = merge_records(merged, frame_to_records(new_df))
+            if needs_backfill:
+                covered_from = start if start is not None else (int(merged['Timestamp'][0]) if len(merged) else None)
+
+            self.write(source, symbol, timeframe, merged, {
+                'covered_from': covered_from,
+                'refreshed_at': time.time(),
+            })
+            return merged
+
+    def load(self, source: str, symbol: str, timeframe: str, start: Optional[int] = None) -> "pd.DataFrame":
+        """
+        Returns the stored series as a DataFrame without contacting any provider.
+        """
+        records = self.read(source, symbol, timeframe)
+        if start is not None:
+            records = records[np.searchsorted(records['Timestamp'], start):]
+        return records_to_frame(records)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> CandleCache:
+    """
+    Returns the process-wide CandleCache instance (created on first use).
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = CandleCache()
+        return _default_cache
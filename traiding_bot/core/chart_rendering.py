@@ -0,0 +1,129 @@
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.metrics import timed
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# Roughly one candle per pixel column of a wide Streamlit chart
+DEFAULT_MAX_BARS = 1200
+
+
+class MarkerSet(NamedTuple):
+    """
+    One kind of signal marker (e.g. all BUY breakouts), drawn as a single WebGL scatter trace.
+
+    Styling is per set rather than per point, which keeps Plotly's validation cost
+    independent of the number of markers.
+    """
+    x: np.ndarray
+    y: np.ndarray
+    text: str
+    color: str
+    symbol: str
+
+
+def downsample_ohlc(data: pd.DataFrame, max_bars: int = DEFAULT_MAX_BARS) -> pd.DataFrame:
+    """
+    Resamples candles to at most `max_bars` bars by merging consecutive groups of equal size.
+
+    Each merged bar keeps the first Open/Datetime, the highest High, the lowest Low,
+    the last Close and the summed Volume, so the chart envelope is preserved.
+    """
+    n = len(data)
+    if n <= max_bars:
+        return data
+
+    step = int(np.ceil(n / max_bars))
+    starts = np.arange(0, n, step)
+    ends = np.minimum(starts + step, n) - 1
+
+    out = {
+        'Datetime': data['Datetime'].to_numpy()[starts],
+        'Open': data['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(data['High'].to_numpy(dtype=float), starts),
+        'Low': np.minimum.reduceat(data['Low'].to_numpy(dtype=float), starts),
+        'Close': data['Close'].to_numpy()[ends],
+    }
+    if 'Volume' in data.columns:
+        out['Volume'] = np.add.reduceat(data['Volume'].to_numpy(dtype=float), starts)
+    return pd.DataFrame(out)
+
+
+def level_lines_trace(levels: Dict[str, float], x_start, x_end, color: str = "blue",
+                      name: str = "Fibonacci") -> "go.Scatter":
+    """
+    All Fibonacci levels as one dashed line trace (segments separated by gaps),
+    labelled at their right end.
+    """
+    import plotly.graph_objects as go
+
+    xs, ys, texts = [], [], []
+    for label, level in levels.items():
+        xs += [x_start, x_end, None]
+        ys += [float(level), float(level), None]
+        texts += ["", label, ""]
+    return go.Scatter(
+        x=xs, y=ys, text=texts, mode="lines+text", textposition="top left",
+        line=dict(color=color, dash="dash", width=1),
+        textfont=dict(color=color, size=10),
+        name=name, hoverinfo="skip", showlegend=False,
+    )
+
+
+def markers_trace(markers: MarkerSet) -> "go.Scattergl":
+    import plotly.graph_objects as go
+
+    return go.Scattergl(
+        x=markers.x, y=markers.y, mode="markers",
+        marker=dict(color=markers.color, symbol=markers.symbol, size=9),
+        name=markers.text, hovertemplate=f"{markers.text}<br>%{{x}}<br>%{{y}}<extra></extra>",
+        showlegend=False,
+    )
+
+
+@timed("figure")
+def build_fibonacci_figure(data: pd.DataFrame, levels: Dict[str, float], markers: Optional[List[MarkerSet]] = None,
+                           name: str = "Price", max_bars: int = DEFAULT_MAX_BARS,
+                           older_levels: Optional[List[Dict[str, float]]] = None) -> "go.Figure":
+    """
+    Builds the candlestick + Fibonacci chart with a bounded number of plotted objects.
+
+    Args:
+        data (pd.DataFrame): Candles with Datetime, Open, High, Low, Close columns.
+        levels (dict): Label -> price of each Fibonacci level.
+        markers (list, optional): MarkerSets, each drawn as one WebGL scatter trace.
+        name (str): Name of the candlestick trace.
+        max_bars (int): Maximum number of candles drawn (roughly the chart width in pixels).
+        older_levels (list, optional): Grids of earlier swing legs, drawn in a lighter color.
+
+    Returns:
+        go.Figure: The chart; its object count does not grow with history length or signal count.
+    """
+    # Plotly is only loaded when a chart is actually drawn
+    import plotly.graph_objects as go
+
+    candles = downsample_ohlc(data, max_bars)
+    fig = go.Figure(data=[go.Candlestick(
+        x=candles['Datetime'],
+        open=candles['Open'],
+        high=candles['High'],
+        low=candles['Low'],
+        close=candles['Close'],
+        name=name
+    )])
+
+    if len(candles):
+        x_start, x_end = candles['Datetime'].iloc[0], candles['Datetime'].iloc[-1]
+        for k, older in enumerate(older_levels or [], start=1):
+            fig.add_trace(level_lines_trace(older, x_start, x_end, color="lightsteelblue", name=f"Fibonacci (leg -{k})"))
+        fig.add_trace(level_lines_trace(levels, x_start, x_end))
+    for marker_set in markers or []:
+        if len(marker_set.x):
+            fig.add_trace(markers_trace(marker_set))
+
+    fig.update_layout(xaxis_rangeslider_visible=False)
+    return fig
@@ -0,0 +1,81 @@
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+# Direction codes stored in CrossingEvents.direction
+UP = 1      # Bullish breakout: previous close below the level, current close above it
+DOWN = -1   # Bearish breakout: previous close above the level, current close below it
+
+
+class CrossingEvents(NamedTuple):
+    """
+    Compact, index-aligned arrays describing every level crossing in a price series.
+
+    Events are ordered by bar index, then by level id.
+    """
+    index: np.ndarray      # int64 - bar at which the close finished crossing the level
+    level_id: np.ndarray   # int32 - column of the crossed level in the level array
+    direction: np.ndarray  # int8  - UP (+1) or DOWN (-1)
+
+    def __len__(self):
+        return len(self.index)
+
+
+def detect_crossings(close, levels, chunk_size: int = 65536) -> CrossingEvents:
+    """
+    Finds all up/down crossings of the close price through a set of levels at once.
+
+    A crossing at bar i means close[i-1] < level < close[i] (UP) or
+    close[i-1] > level > close[i] (DOWN). Touching a level exactly is not a crossing.
+
+    Args:
+        close (array-like): Close prices, shape (bars,).
+        levels (array-like): Either fixed levels, shape (n_levels,), or a time-varying
+            grid, shape (bars, n_levels), where row i is the grid in force at bar i.
+        chunk_size (int): Bars compared per block, bounding the temporary boolean
+            matrices to chunk_size x n_levels.
+
+    Returns:
+        CrossingEvents: Arrays of (index, level_id, direction).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    levels = np.asarray(levels, dtype=np.float64)
+    time_varying = levels.ndim == 2
+    if time_varying and len(levels) != len(close):
+        raise ValueError("A 2-D level grid must have one row per bar.")
+
+    indices, level_ids, directions = [], [], []
+
+    for start in range(1, len(close), chunk_size):
+        stop = min(start + chunk_size, len(close))
+        prev = close[start - 1:stop - 1, None]
+        curr = close[start:stop, None]
+        lv = levels[start:stop] if time_varying else levels[None, :]
+
+        up = (prev < lv) & (curr > lv)
+        down = (prev > lv) & (curr < lv)
+
+        rows, cols = np.nonzero(up | down)
+        indices.append(rows.astype(np.int64) + start)
+        level_ids.append(cols.astype(np.int32))
+        directions.append(np.where(up[rows, cols], UP, DOWN).astype(np.int8))
+
+    if not indices:
+        return CrossingEvents(np.empty(0, np.int64), np.empty(0, np.int32), np.empty(0, np.int8))
+
+    return CrossingEvents(np.concatenate(indices), np.concatenate(level_ids), np.concatenate(directions))
+
+
+def detect_threshold_breaches(close, upper: float, lower: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the bars whose close is above `upper` or below `lower`.
+
+    A bar above `upper` is never reported as below `lower`, even if the band is inverted.
+
+    Returns:
+        tuple: (above_indices, below_indices) as int64 arrays.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    above = close > upper
+    below = (close < lower) & ~above
+    return np.flatnonzero(above), np.flatnonzero(below)
@@ -0,0 +1,230 @@
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from core.candle_cache import CANDLE_DTYPE, CandleCache, OHLCV_COLUMNS, get_default_cache, records_to_frame
+from core.exchange_clients import fetch_ohlcv_range, get_client_registry
+from core.metrics import PROVIDER_BYTES, PROVIDER_REQUESTS, PROVIDER_ROWS, inc, timed
+from core.resample import SESSIONS, SOURCE_SESSIONS, resample_records
+from core.timeframes import timeframe_to_ms
+
+# Finest resolution stored per source; coarser timeframes are derived from it locally
+BASE_TIMEFRAMES = {
+    'binance': '1h',
+    'yfinance': '1h',
+}
+
+# Coarser bars are built locally when the base series needed is at most this long
+# (or is already stored); otherwise the provider is asked for the timeframe directly.
+MAX_DERIVED_BASE_BARS = 20_000
+
+# Yahoo Finance only serves intraday history for roughly the last two years
+YFINANCE_INTRADAY_MAX_MS = 729 * 86_400_000
+
+
+class DataFetchError(RuntimeError):
+    """
+    Raised when candles for a symbol could not be retrieved from the cache or the provider.
+    """
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+# --- Provider Fetchers ---
+
+def _count_received(provider: str, rows: int):
+    # Payload size measured as the decoded candle records (CANDLE_DTYPE bytes per candle)
+    inc(PROVIDER_ROWS, rows, provider=provider)
+    inc(PROVIDER_BYTES, rows * CANDLE_DTYPE.itemsize, provider=provider)
+
+
+def _binance_fetcher(symbol: str, timeframe: str):
+    def fetch(since, until=None):
+        # Pooled client, concurrent pagination over the whole [since, until or now) range
+        with timed("provider_fetch", provider='binance'):
+            rows = fetch_ohlcv_range('binance', symbol, timeframe, since, until)
+        _count_received('binance', len(rows))
+        return pd.DataFrame(rows, columns=OHLCV_COLUMNS)
+    return fetch
+
+
+def _yfinance_history(ticker, **kwargs) -> pd.DataFrame:
+    inc(PROVIDER_REQUESTS, provider='yfinance')
+    with timed("provider_fetch", provider='yfinance'):
+        df = ticker.history(**kwargs)
+    _count_received('yfinance', len(df) if df is not None else 0)
+    return df
+
+
+def _yfinance_fetcher(symbol: str, interval: str):
+    ticker = get_client_registry().ticker(symbol)
+
+    def fetch(since, until=None):
+        end = pd.Timestamp(until, unit='ms', tz='UTC') if until is not None else None
+        df = _yfinance_history(ticker, start=pd.Timestamp(since, unit='ms', tz='UTC'), end=end, interval=interval)
+        return history_to_ohlcv(df)
+    return fetch
+
+
+_FETCHERS = {
+    'binance': _binance_fetcher,
+    'yfinance': _yfinance_fetcher,
+}
+
+
+def update_series(source: str, symbol: str, timeframe: str, start: int,
+                  cache: Optional[CandleCache] = None) -> np.ndarray:
+    """
+    Brings the cached (source, symbol, timeframe) series up to date from `start` (ms) on.
+
+    Returns:
+        np.ndarray: All stored candle records for the series.
+    """
+    cache = cache or get_default_cache()
+    return cache.update(source, symbol, timeframe, _FETCHERS[source](symbol, timeframe), start=start)
+
+
+# --- Public Loaders ---
+
+def resolve_source(symbol: str, screener: str) -> tuple:
+    """
+    Maps a watchlist entry to its candle source: crypto pairs come from Binance, stocks from Yahoo.
+
+    Returns:
+        tuple: (source, market symbol), e.g. ('binance', 'XRP/USDT') for 'XRPUSDT'.
+    """
+    if screener == "crypto":
+        return "binance", symbol.replace("USDT", "/USDT") if "/" not in symbol else symbol
+    return "yfinance", symbol
+
+
+def fetch_binance_ohlcv(symbol: str = 'XRP/USDT', timeframe: str = '1h', limit: int = 500,
+                        cache: Optional[CandleCache] = None) -> pd.DataFrame:
+    """
+    Returns the latest `limit` Binance candles, served from the local candle cache.
+
+    Only candles newer than the last stored timestamp are requested from the exchange.
+
+    Args:
+        symbol (str): The trading pair (e.g., 'XRP/USDT').
+        timeframe (str): Data resolution (e.g., '1h', '1d').
+        limit (int): Number of candles to return.
+        cache (CandleCache, optional): Store to use (defaults to the shared one).
+
+    Returns:
+        pd.DataFrame: Timestamp, Open, High, Low, Close, Volume and 'Datetime'.
+    """
+    tf_ms = timeframe_to_ms(timeframe)
+    start = (_now_ms() // tf_ms - limit + 1) * tf_ms
+    records = update_series('binance', symbol, timeframe, start, cache)
+    return records_to_frame(records[-limit:])
+
+
+def fetch_yfinance_ohlcv(symbol: str, period: str = '1mo', interval: str = '1h',
+                         cache: Optional[CandleCache] = None) -> pd.DataFrame:
+    """
+    Returns Yahoo Finance candles for the requested period, served from the local candle cache.
+
+    Args:
+        symbol (str): The stock ticker symbol (e.g., 'AAPL', 'QQQ').
+        period (str): The historical period (e.g., '1mo', '1y').
+        interval (str): The data resolution (e.g., '1h', '1d').
+        cache (CandleCache, optional): Store to use (defaults to the shared one).
+
+    Returns:
+        pd.DataFrame: Timestamp, Open, High, Low, Close, Volume and 'Datetime'.
+    """
+    # 'ytd' / 'max' have no fixed length, so those requests always go to the provider
+    try:
+        start = _now_ms() - timeframe_to_ms(period)
+    except ValueError:
+        df = _yfinance_history(get_client_registry().ticker(symbol), period=period, interval=interval)
+        return history_to_frame(df)
+
+    records = update_series('yfinance', symbol, interval, start, cache)
+    records = records[records['Timestamp'] >= start]
+    return records_to_frame(records)
+
+
+@timed("load_candles")
+def load_candles(source: str, symbol: str, timeframe: str, period: Optional[str] = None,
+                 limit: int = 500, cache: Optional[CandleCache] = None) -> pd.DataFrame:
+    """
+    Serves a (symbol, timeframe, range) request, preferring bars resampled from local data.
+
+    Timeframes coarser than the source's base resolution (e.g. 4h, 1d, 1wk from 1h) are
+    aggregated from the cached base series with session-aware alignment, so switching
+    intervals only fetches new base candles instead of downloading a new resolution.
+
+    Args:
+        source (str): 'binance' or 'yfinance'.
+        symbol (str): Trading pair or ticker.
+        timeframe (str): Requested resolution.
+        period (str, optional): Range as a period string (e.g., '1mo'); if omitted the
+            latest `limit` bars are returned.
+        limit (int): Number of bars when no period is given.
+        cache (CandleCache, optional): Store to use (defaults to the shared one).
+
+    Returns:
+        pd.DataFrame: Timestamp, Open, High, Low, Close, Volume and 'Datetime'.
+    """
+    cache = cache or get_default_cache()
+    now = _now_ms()
+    tf_ms = timeframe_to_ms(timeframe)
+    base = BASE_TIMEFRAMES[source]
+    base_ms = timeframe_to_ms(base)
+
+    if period is not None:
+        try:
+            start = now - timeframe_to_ms(period)
+        except ValueError:
+            start = None
+    else:
+        start = (now // tf_ms - limit + 1) * tf_ms
+
+    derivable = start is not None and tf_ms > base_ms and tf_ms % base_ms == 0
+    if derivable:
+        # Fetch one extra coarse bar of base data so the first returned bar is complete
+        base_start = start - tf_ms
+        covered = cache.read_meta(source, symbol, base).get('covered_from')
+        is_stored = covered is not None and covered <= base_start
+        is_small = (now - base_start) // base_ms <= MAX_DERIVED_BASE_BARS
+        if source == 'yfinance' and now - base_start > YFINANCE_INTRADAY_MAX_MS:
+            is_small = False
+
+        if is_stored or is_small:
+            records = update_series(source, symbol, base, base_start, cache)
+            records = records[records['Timestamp'] >= base_start]
+            bars = resample_records(records, timeframe, SESSIONS[SOURCE_SESSIONS[source]])
+            if period is not None:
+                bars = bars[bars['Timestamp'] + tf_ms > start]
+            else:
+                bars = bars[-limit:]
+            return records_to_frame(bars)
+
+    if source == 'binance':
+        return fetch_binance_ohlcv(symbol, timeframe=timeframe, limit=limit, cache=cache)
+    return fetch_yfinance_ohlcv(symbol, period=period or '1mo', interval=timeframe, cache=cache)
+
+
+# --- yfinance Helpers ---
+
+def history_to_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts a yfinance `history()` frame (DatetimeIndex) into the standard OHLCV layout.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    out = df[['Open', 'High', 'Low', 'Close', 'Volume']].astype(float).reset_index(drop=True)
+    out.insert(0, 'Timestamp', df.index.as_unit('ms').asi8)
+    return out
+
+
+def history_to_frame(df: pd.DataFrame) -> pd.DataFrame:
+    out = history_to_ohlcv(df)
+    out['Datetime'] = pd.to_datetime(out['Timestamp'], unit='ms')
+    return out
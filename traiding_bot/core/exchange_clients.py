@@ -0,0 +1,178 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.metrics import PROVIDER_REQUESTS, inc
+from core.rate_limit import RateLimiter
+from core.timeframes import timeframe_to_ms
+
+
+class CcxtTransport:
+    """
+    Shares one ccxt exchange instance (HTTP session + market metadata) across all callers.
+
+    Requests are throttled by a RateLimiter derived from the exchange's own `rateLimit`,
+    which, unlike ccxt's per-instance throttle, is safe to share between threads.
+    """
+
+    def __init__(self, exchange_id: str, max_limit: int = 1000):
+        # ccxt takes ~0.5s to import, so it is only loaded once a real exchange is needed
+        import ccxt
+
+        self.retryable = (ccxt.NetworkError,)   # Includes RateLimitExceeded and DDoSProtection
+        self.exchange = getattr(ccxt, exchange_id)({'enableRateLimit': False})
+        self.max_limit = max_limit
+        self.rate_limiter = RateLimiter(1000 / max(self.exchange.rateLimit, 1), burst=5)
+        self._markets_lock = threading.Lock()
+
+    def _ensure_markets(self):
+        if not self.exchange.markets:
+            with self._markets_lock:
+                if not self.exchange.markets:
+                    self.rate_limiter.acquire()
+                    self.exchange.load_markets()
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str, since: int, limit: int) -> List[list]:
+        self._ensure_markets()
+        self.rate_limiter.acquire()
+        return self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+
+
+class FakeExchangeTransport:
+    """
+    Serves canned candles without network access (tests, benchmarks, offline development).
+
+    Responses follow the ccxt contract: up to `limit` rows with timestamp >= since.
+    """
+
+    retryable = (ConnectionError,)
+
+    def __init__(self, candles: Dict[Tuple[str, str], list], max_limit: int = 1000):
+        """
+        Args:
+            candles (dict): (symbol, timeframe) -> rows of [timestamp, open, high, low, close, volume],
+                sorted by timestamp.
+        """
+        self.candles = {key: np.asarray(rows, dtype=np.float64) for key, rows in candles.items()}
+        self.max_limit = max_limit
+        self.rate_limiter = None
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str, since: int, limit: int) -> List[list]:
+        with self._lock:
+            self.calls += 1
+        rows = self.candles.get((symbol, timeframe))
+        if rows is None or len(rows) == 0:
+            return []
+        first = int(np.searchsorted(rows[:, 0], since)) if since is not None else max(len(rows) - limit, 0)
+        page = rows[first:first + limit]
+        return [[int(r[0]), *r[1:].tolist()] for r in page]
+
+
+class ClientRegistry:
+    """
+    Process-wide pool of exchange transports and yfinance tickers.
+
+    Each exchange gets one transport (created on first use); tests can register a fake
+    transport under the same id to replace the network.
+    """
+
+    def __init__(self):
+        self._transports = {}
+        self._tickers = {}
+        self._lock = threading.Lock()
+
+    def register(self, exchange_id: str, transport):
+        with self._lock:
+            self._transports[exchange_id] = transport
+
+    def transport(self, exchange_id: str):
+        with self._lock:
+            transport = self._transports.get(exchange_id)
+            if transport is None:
+                transport = self._transports[exchange_id] = CcxtTransport(exchange_id)
+            return transport
+
+    def ticker(self, symbol: str):
+        """
+        Returns the shared yfinance Ticker for a symbol.
+        """
+        import yfinance as yf
+
+        with self._lock:
+            ticker = self._tickers.get(symbol)
+            if ticker is None:
+                ticker = self._tickers[symbol] = yf.Ticker(symbol)
+            return ticker
+
+
+_registry = ClientRegistry()
+
+
+def get_client_registry() -> ClientRegistry:
+    return _registry
+
+
+def call_with_retries(fn, retryable: tuple, retries: int = 4, base_delay: float = 0.5):
+    """
+    Calls fn(), retrying retryable errors with exponential backoff (base_delay * 2^attempt).
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except retryable:
+            if attempt == retries:
+                raise
+            time.sleep(base_delay * (2 ** attempt))
+
+
+def fetch_ohlcv_range(exchange_id: str, symbol: str, timeframe: str, since: int, until: Optional[int] = None,
+                      max_workers: int = 4, registry: Optional[ClientRegistry] = None) -> List[list]:
+    """
+    Fetches every candle in [since, until) by paginating `fetch_ohlcv` on `since`.
+
+    The range is split into pages of `max_limit` candles that are requested concurrently
+    (at most `max_workers` at a time, all throttled by the exchange's shared rate limiter),
+    each with retry/backoff on network errors.
+
+    Args:
+        exchange_id (str): ccxt exchange id (e.g., 'binance').
+        symbol (str): Trading pair (e.g., 'XRP/USDT').
+        timeframe (str): Candle resolution.
+        since (int): First candle time, epoch ms.
+        until (int, optional): End of the range (exclusive), epoch ms; defaults to now.
+        max_workers (int): Maximum concurrent page requests.
+        registry (ClientRegistry, optional): Transport pool (defaults to the shared one).
+
+    Returns:
+        list: Rows of [timestamp, open, high, low, close, volume], sorted and de-duplicated.
+    """
+    transport = (registry or get_client_registry()).transport(exchange_id)
+    until = until if until is not None else int(time.time() * 1000)
+    tf_ms = timeframe_to_ms(timeframe)
+    page_ms = transport.max_limit * tf_ms
+    page_starts = list(range(int(since), int(until), page_ms)) or [int(since)]
+
+    def fetch_page(page_since):
+        inc(PROVIDER_REQUESTS, provider=exchange_id)
+        return call_with_retries(
+            lambda: transport.fetch_ohlcv(symbol, timeframe, page_since, transport.max_limit),
+            transport.retryable,
+        )
+
+    if len(page_starts) == 1:
+        pages = [fetch_page(page_starts[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(page_starts)))) as pool:
+            pages = list(pool.map(fetch_page, page_starts))
+
+    rows = {}
+    for page in pages:
+        for row in page:
+            if row[0] < until:
+                rows[row[0]] = row
+    return [rows[ts] for ts in sorted(rows)]
@@ -1,9 +1,79 @@
+import numpy as np
+
+# Fixed ratio index shared by the dict API and the array API.
+# Column j of every level grid corresponds to FIB_RATIOS[j] / FIB_LABELS[j].
+FIB_RATIOS = np.array([0.0, 0.236, 0.382, 0.5, 0.618, 0.786, 1.0])
+FIB_LABELS = ("0.0%", "23.6%", "38.2%", "50.0%", "61.8%", "78.6%", "100.0%")
+FIB_INDEX = {label: i for i, label in enumerate(FIB_LABELS)}
+
+
+def fibonacci_level_grid(highs, lows, ratios=FIB_RATIOS) -> np.ndarray:
+    """
+    Vectorized Fibonacci retracement levels for many swing ranges at once.
+
+    Args:
+        highs (array-like): Swing highs, scalar or shape (bars,).
+        lows (array-like): Swing lows, same shape as `highs`.
+        ratios (array-like): Retracement ratios; defaults to FIB_RATIOS.
+
+    Returns:
+        np.ndarray: Levels of shape highs.shape + (len(ratios),), computed as
+            high - ratio * (high - low). Ratio 0 and 1 are exactly the high and low.
+    """
+    highs = np.asarray(highs, dtype=np.float64)
+    lows = np.asarray(lows, dtype=np.float64)
+    ratios = np.asarray(ratios, dtype=np.float64)
+
+    diff = highs - lows
+    grid = highs[..., None] - diff[..., None] * ratios
+
+    # Pin the end points so they are not subject to floating point drift
+    grid[..., ratios == 0.0] = highs[..., None]
+    grid[..., ratios == 1.0] = lows[..., None]
+    return grid
+
+
+def rolling_swing_range(high, low, window: int, min_periods: int = None) -> tuple:
+    """
+    Rolling N-bar swing high and swing low over a whole series.
+
+    Args:
+        high (array-like): High prices, shape (bars,).
+        low (array-like): Low prices, shape (bars,).
+        window (int): Number of bars in each swing window (including the current bar).
+        min_periods (int): Bars required before a value is produced (default: window).
+            Earlier bars are NaN.
+
+    Returns:
+        tuple: (swing_highs, swing_lows) as float64 arrays of shape (bars,).
+    """
+    # pandas' rolling max/min is O(n); imported here so level math alone stays numpy-only
+    import pandas as pd
+
+    min_periods = window if min_periods is None else min_periods
+    swing_highs = pd.Series(np.asarray(high, dtype=np.float64)).rolling(window, min_periods=min_periods).max()
+    swing_lows = pd.Series(np.asarray(low, dtype=np.float64)).rolling(window, min_periods=min_periods).min()
+    return swing_highs.to_numpy(), swing_lows.to_numpy()
+
+
+def rolling_fibonacci_levels(high, low, window: int, min_periods: int = None, ratios=FIB_RATIOS) -> np.ndarray:
+    """
+    Time-varying retracement grid: levels computed over a rolling swing window for every bar.
+
+    Returns:
+        np.ndarray: Shape (bars, len(ratios)); rows before `min_periods` bars are NaN.
+    """
+    swing_highs, swing_lows = rolling_swing_range(high, low, window, min_periods)
+    return fibonacci_level_grid(swing_highs, swing_lows, ratios)
+
+
 def calculate_fibonacci_levels(high: float, low: float) -> dict:
     """
     Calculates standard Fibonacci retracement levels for a given price range.
 
     This function computes key support and resistance levels used in technical analysis
     by applying standard Fibonacci ratios to the difference between the high and low prices.
+    It is a thin wrapper around `fibonacci_level_grid` for a single swing range.
 
     Args:
         high (float): The highest price in the selected period (Swing High).
@@ -12,19 +82,12 @@ def calculate_fibonacci_levels(high: float, low: float) -> dict:
     Returns:
         dict: A dictionary mapping Fibonacci percentages (e.g., '61.8%') to their calculated price levels.
     """
-    
-    # Calculate the vertical price range (Swing High - Swing Low)
-    diff = high - low
-
-    # Compute retracement levels by subtracting the ratio portion from the high
-    levels = {
-        "0.0%": high,                    # The Peak (Resistance)
-        "23.6%": high - 0.236 * diff,    # Shallow retracement
-        "38.2%": high - 0.382 * diff,    # Moderate support level
-        "50.0%": high - 0.5 * diff,      # Psychological level (Market midpoint)
-        "61.8%": high - 0.618 * diff,    # The "Golden Ratio" - Key support/resistance level
-        "78.6%": high - 0.786 * diff,    # Deep retracement
-        "100.0%": low,                   # The Trough (Support)
-    }
-
-    return levels
\ No newline at end of file
+    # 0.0%   - The Peak (Resistance)
+    # 23.6%  - Shallow retracement
+    # 38.2%  - Moderate support level
+    # 50.0%  - Psychological level (Market midpoint)
+    # 61.8%  - The "Golden Ratio" - Key support/resistance level
+    # 78.6%  - Deep retracement
+    # 100.0% - The Trough (Support)
+    grid = fibonacci_level_grid(high, low)
+    return {label: float(level) for label, level in zip(FIB_LABELS, grid)}
@@ -0,0 +1,183 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from core.fibonacci_utils import FIB_LABELS
+
+# One indexed level: its price plus where it came from
+LEVEL_DTYPE = np.dtype([
+    ('price', '<f8'),
+    ('label', '<i2'),    # Index into the index's `labels` (e.g. FIB_LABELS)
+    ('grid', '<i4'),     # Source grid (swing leg, timeframe, ...)
+    ('weight', '<f4'),   # Contribution to confluence scores
+])
+
+
+class BandMatches(NamedTuple):
+    """
+    Result of a batched band query: the levels matching query i are
+    `index.levels[start[i]:stop[i]]` (contiguous, sorted by price).
+    """
+    start: np.ndarray   # int64
+    stop: np.ndarray    # int64
+
+    @property
+    def counts(self) -> np.ndarray:
+        return self.stop - self.start
+
+
+class ConfluenceZone(NamedTuple):
+    """
+    A cluster of levels lying within the tolerance of their neighbours.
+    """
+    low: float
+    high: float
+    center: float    # Weight-averaged price
+    count: int
+    grids: int       # Number of distinct source grids in the cluster
+    score: float     # Sum of weights
+
+
+class LevelIndex:
+    """
+    Price levels of any number of grids, sorted by price for O(log n + k) band queries.
+
+    Levels are kept in one LEVEL_DTYPE array, so the index for hundreds of levels is a
+    single allocation and every query is a pair of `searchsorted` calls.
+    """
+
+    def __init__(self, levels: np.ndarray, labels: Sequence[str] = FIB_LABELS):
+        self.levels = np.sort(np.asarray(levels, dtype=LEVEL_DTYPE), order='price', kind='stable')
+        self.labels = tuple(labels)
+        self.prices = np.ascontiguousarray(self.levels['price'])
+        # Prefix sums of the weights turn any band's score into two lookups
+        self._weight_sums = np.r_[0.0, np.cumsum(self.levels['weight'], dtype=np.float64)]
+
+    @classmethod
+    def from_grids(cls, grids, weights=None, labels: Sequence[str] = FIB_LABELS) -> "LevelIndex":
+        """
+        Args:
+            grids (array-like): Level prices, shape (n_grids, len(labels)); NaN entries are skipped.
+            weights (array-like, optional): Weight per grid (default 1.0).
+        """
+        grids = np.atleast_2d(np.asarray(grids, dtype=np.float64))
+        n_grids, n_labels = grids.shape
+        weights = np.ones(n_grids) if weights is None else np.asarray(weights, dtype=np.float64)
+
+        levels = np.empty(grids.size, dtype=LEVEL_DTYPE)
+        levels['price'] = grids.ravel()
+        levels['label'] = np.tile(np.arange(n_labels), n_grids)
+        levels['grid'] = np.repeat(np.arange(n_grids), n_labels)
+        levels['weight'] = np.repeat(weights, n_labels)
+        return cls(levels[~np.isnan(levels['price'])], labels)
+
+    @classmethod
+    def from_dicts(cls, grids: List[Dict[str, float]], weights=None) -> "LevelIndex":
+        """
+        Builds an index from label -> price dicts (e.g. calculate_fibonacci_levels / swing_levels).
+        """
+        labels = list(FIB_LABELS)
+        for grid in grids:
+            labels += [label for label in grid if label not in labels]
+        rows = np.full((len(grids), len(labels)), np.nan)
+        for g, grid in enumerate(grids):
+            for label, price in grid.items():
+                rows[g, labels.index(label)] = price
+        return cls.from_grids(rows, weights, labels)
+
+    def __len__(self):
+        return len(self.levels)
+
+    # --- Queries ---
+
+    def query(self, price: float, tolerance: float) -> np.ndarray:
+        """
+        Every level within `tolerance` (absolute price distance) of `price`, sorted by price.
+
+        Returns:
+            np.ndarray: LEVEL_DTYPE view into the index.
+        """
+        start = np.searchsorted(self.prices, price - tolerance, side='left')
+        stop = np.searchsorted(self.prices, price + tolerance, side='right')
+        return self.levels[start:stop]
+
+    def query_many(self, prices, tolerances) -> BandMatches:
+        """
+        Band queries for many prices at once.
+
+        Args:
+            prices (array-like): Query prices, shape (n,).
+            tolerances (array-like or float): Absolute band half-widths, broadcast to (n,).
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        tolerances = np.broadcast_to(np.asarray(tolerances, dtype=np.float64), prices.shape)
+        return BandMatches(
+            np.searchsorted(self.prices, prices - tolerances, side='left'),
+            np.searchsorted(self.prices, prices + tolerances, side='right'),
+        )
+
+    def nearest(self, prices) -> np.ndarray:
+        """
+        Position (into `levels`) of the level closest to each price; -1 for an empty index.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        if len(self.prices) == 0:
+            return np.full(prices.shape, -1, dtype=np.int64)
+        if len(self.prices) == 1:
+            return np.zeros(prices.shape, dtype=np.int64)
+        right = np.clip(np.searchsorted(self.prices, prices), 1, len(self.prices) - 1)
+        left = right - 1
+        use_left = np.abs(prices - self.prices[left]) <= np.abs(self.prices[right] - prices)
+        return np.where(use_left, left, right)
+
+    def confluence(self, prices, tolerances) -> np.ndarray:
+        """
+        Confluence score of each price: the summed weight of all levels inside its band.
+        """
+        matches = self.query_many(prices, tolerances)
+        return self._weight_sums[matches.stop] - self._weight_sums[matches.start]
+
+    def zones(self, tolerance_ratio: float, min_count: int = 2) -> List[ConfluenceZone]:
+        """
+        Groups the sorted levels into clusters whose neighbours are at most
+        `tolerance_ratio` x price apart, keeping clusters of at least `min_count` levels.
+
+        Returns:
+            list: ConfluenceZones ordered by descending score.
+        """
+        if len(self.prices) == 0:
+            return []
+        gaps = np.diff(self.prices) > tolerance_ratio * self.prices[1:]
+        starts = np.flatnonzero(np.r_[True, gaps])
+        stops = np.r_[starts[1:], len(self.prices)]
+
+        weights = self.levels['weight'].astype(np.float64)
+        scores = np.add.reduceat(weights, starts)
+        weighted = np.add.reduceat(weights * self.prices, starts)
+
+        zones = []
+        for start, stop, score, total in zip(starts, stops, scores, weighted):
+            if stop - start < min_count:
+                continue
+            center = total / score if score > 0 else float(self.prices[start:stop].mean())
+            zones.append(ConfluenceZone(
+                low=float(self.prices[start]), high=float(self.prices[stop - 1]), center=float(center),
+                count=int(stop - start), grids=len(np.unique(self.levels['grid'][start:stop])),
+                score=float(score),
+            ))
+        return sorted(zones, key=lambda zone: zone.score, reverse=True)
+
+    def label_of(self, level) -> str:
+        return self.labels[int(level['label'])]
+
+
+def match_levels(levels: List[Dict[str, float]], price: float, tolerance: float,
+                 index: Optional[LevelIndex] = None) -> List[tuple]:
+    """
+    Convenience wrapper: (label, price, grid) of every level within `tolerance` of `price`,
+    closest first.
+    """
+    index = index or LevelIndex.from_dicts(levels)
+    hits = index.query(price, tolerance)
+    order = np.argsort(np.abs(hits['price'] - price), kind='stable')
+    return [(index.label_of(hit), float(hit['price']), int(hit['grid'])) for hit in hits[order]]
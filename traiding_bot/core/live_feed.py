@@ -0,0 +1,254 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from core.candle_cache import CANDLE_DTYPE
+from core.ring_store import RingStore
+from core.streaming import Candle, MultiSymbolMonitor, SignalEvent
+
+# Default address of core.replay_server
+DEFAULT_REPLAY_URL = "ws://localhost:8765"
+
+
+class CandleUpdate(NamedTuple):
+    symbol: str
+    candle: Candle
+    closed: bool     # False while the bar is still forming
+
+
+# --- Stream Parsers ---
+
+def parse_replay_message(message: str) -> List[CandleUpdate]:
+    """
+    Parses a core.replay_server message (one batch of candles for many symbols).
+    """
+    payload = json.loads(message)
+    if payload.get("type") != "candles":
+        return []
+    return [CandleUpdate(c["s"], Candle(int(c["t"]), float(c["o"]), float(c["h"]), float(c["l"]),
+                                        float(c["c"]), float(c["v"])), bool(c["x"]))
+            for c in payload["candles"]]
+
+
+def parse_binance_kline(message: str) -> List[CandleUpdate]:
+    """
+    Parses a Binance combined-stream kline message ({"stream": ..., "data": {"e": "kline", ...}}).
+    Symbols are returned as 'XRP/USDT' style pairs for USDT markets.
+    """
+    payload = json.loads(message)
+    data = payload.get("data", payload)
+    if data.get("e") != "kline":
+        return []
+    k = data["k"]
+    symbol = data["s"]
+    if symbol.endswith("USDT"):
+        symbol = symbol[:-4] + "/USDT"
+    return [CandleUpdate(symbol, Candle(int(k["t"]), float(k["o"]), float(k["h"]), float(k["l"]),
+                                        float(k["c"]), float(k["v"])), bool(k["x"]))]
+
+
+def binance_stream_url(symbols: Iterable[str], timeframe: str = "1h") -> str:
+    """
+    One combined-stream connection for the whole watchlist, e.g. 'XRP/USDT' -> 'xrpusdt@kline_1h'.
+    """
+    streams = "/".join(f"{symbol.replace('/', '').lower()}@kline_{timeframe}" for symbol in symbols)
+    return f"wss://stream.binance.com:9443/stream?streams={streams}"
+
+
+class LiveFeed:
+    """
+    Push-based candle feed: an asyncio consumer of one websocket stream that keeps a
+    ring buffer per symbol current (core.ring_store; an update for the bar in progress
+    replaces it in place) and runs the streaming Fibonacci engine on closed bars.
+
+    The consumer runs on a background thread, so synchronous code (the Streamlit
+    dashboard) reads snapshots and asks for the symbols changed since its last look
+    instead of polling the providers. Cost per update is O(1) regardless of watchlist size.
+    """
+
+    def __init__(self, url: str = DEFAULT_REPLAY_URL, parser: Callable[[str], List[CandleUpdate]] = parse_replay_message,
+                 timeframe: str = "1h", buffer_size: int = 500, max_events: int = 200, reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 30.0, **engine_kwargs):
+        """
+        Args:
+            url (str): Websocket URL (replay server or e.g. binance_stream_url(...)).
+            parser (callable): Turns one message into CandleUpdates.
+            timeframe (str): Resolution of the streamed candles (key of the ring store).
+            buffer_size (int): Candles kept per symbol.
+            max_events (int): Recent SignalEvents kept.
+            reconnect_delay (float): First retry delay after a disconnect (doubles up to max_reconnect_delay).
+            **engine_kwargs: Passed to every StreamingFibonacciEngine (window, tolerance_ratio, ...).
+        """
+        self.url = url
+        self.parser = parser
+        self.timeframe = timeframe
+        self.buffer_size = buffer_size
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self.store = RingStore(capacity=buffer_size)
+        self.monitor = MultiSymbolMonitor(**engine_kwargs)
+        self.events = deque(maxlen=max_events)
+        self.connected = False
+        self.error: Optional[str] = None
+
+        self._versions: Dict[str, int] = {}
+        self._received_at: Dict[str, float] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._loop = None
+        self._stop = None
+        self._task = None
+
+    # --- Update Path ---
+
+    def seed(self, symbol: str, records: np.ndarray):
+        """
+        Pre-fills a symbol's buffer (and engine) from stored candles, e.g. the candle cache.
+        """
+        candles = [Candle(int(ts), o, h, l, c, v) for ts, o, h, l, c, v in records[-self.buffer_size:].tolist()]
+        self.apply([CandleUpdate(symbol, candle, True) for candle in candles])
+
+    def apply(self, updates: Iterable[CandleUpdate]) -> List[SignalEvent]:
+        """
+        Applies candle updates to the buffers; closed bars also drive the signal engine.
+        """
+        now = time.time()
+        events = []
+        with self._lock:
+            for symbol, candle, closed in updates:
+                self.store.append(symbol, self.timeframe, candle)
+                if closed:
+                    events += self.monitor.update(symbol, candle)
+                self._version += 1
+                self._versions[symbol] = self._version
+                self._received_at[symbol] = now
+            self.events.extend(events)
+        return events
+
+    async def consume(self):
+        """
+        Reads the stream until stopped, reconnecting with exponential backoff.
+        """
+        import websockets
+
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            try:
+                async with websockets.connect(self.url) as websocket:
+                    self.connected, self.error = True, None
+                    delay = self.reconnect_delay
+                    async for message in websocket:
+                        self.apply(self.parser(message))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.error = str(e)
+            self.connected = False
+            if not self._stop.is_set():
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    # --- Lifecycle ---
+
+    def start(self) -> "LiveFeed":
+        """
+        Starts the consumer on a daemon thread with its own event loop.
+        """
+        if self._thread is not None:
+            return self
+
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._stop = asyncio.Event()
+            self._task = self._loop.create_task(self.consume())
+            ready.set()
+            try:
+                self._loop.run_until_complete(self._task)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="live-feed", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is None:
+            return
+
+        def cancel():
+            # A blocked websocket read only ends by cancelling the consumer task
+            self._stop.set()
+            self._task.cancel()
+
+        self._loop.call_soon_threadsafe(cancel)
+        self._thread.join(timeout)
+        self._thread = None
+
+    # --- Read Path ---
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def symbols(self) -> List[str]:
+        # Rings and receive times are added together under the lock by apply()
+        with self._lock:
+            return sorted(symbol for symbol, _ in self.store.rings)
+
+    def changed_since(self, version: int) -> Tuple[int, List[str]]:
+        """
+        Returns (current version, symbols updated after `version`) for incremental redraws.
+        """
+        with self._lock:
+            return self._version, [s for s, v in self._versions.items() if v > version]
+
+    def latest(self, symbol: str) -> Optional[Candle]:
+        with self._lock:
+            ring = self.store.get(symbol, self.timeframe)
+            last = ring.last() if ring is not None else None
+            return Candle(*last) if last is not None else None
+
+    def age(self, symbol: str) -> Optional[float]:
+        """
+        Seconds since the last update of a symbol was received.
+        """
+        with self._lock:
+            received = self._received_at.get(symbol)
+        return None if received is None else time.time() - received
+
+    def records(self, symbol: str) -> np.ndarray:
+        """
+        Copy of a symbol's buffered candles as CANDLE_DTYPE records.
+        """
+        with self._lock:
+            ring = self.store.get(symbol, self.timeframe)
+            return ring.records() if ring is not None else np.empty(0, dtype=CANDLE_DTYPE)
+
+    def frame(self, symbol: str):
+        """
+        DataFrame copy of a symbol's candles (plotting boundary).
+        """
+        from core.candle_cache import records_to_frame
+
+        return records_to_frame(self.records(symbol))
+
+    def recent_events(self, symbol: Optional[str] = None) -> List[SignalEvent]:
+        with self._lock:
+            return [e for e in self.events if symbol is None or e.symbol == symbol]
@@ -0,0 +1,382 @@
+import bisect
+import json
+import os
+import threading
+import time
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+
+# Latency histogram bucket upper bounds, in seconds (Prometheus-style, +Inf implied)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Prefix of every exported metric name
+METRIC_PREFIX = "fibobot_"
+
+# Metric names used across the project
+STAGE_SECONDS = "stage_seconds"                  # Histogram: latency of a timed stage
+STAGE_ERRORS = "stage_errors_total"              # Counter: stages that raised
+CACHE_REQUESTS = "cache_requests_total"          # Counter: cache lookups by result (hit / miss)
+PROVIDER_REQUESTS = "provider_requests_total"    # Counter: upstream requests per provider
+PROVIDER_ROWS = "provider_rows_total"            # Counter: candles / symbols received per provider
+PROVIDER_BYTES = "provider_bytes_total"          # Counter: payload bytes received per provider
+
+HELP = {
+    STAGE_SECONDS: "Latency of instrumented stages in seconds.",
+    STAGE_ERRORS: "Instrumented stages that raised an exception.",
+    CACHE_REQUESTS: "Cache lookups by cache and result.",
+    PROVIDER_REQUESTS: "Requests sent to upstream data providers.",
+    PROVIDER_ROWS: "Rows (candles or symbols) received from upstream data providers.",
+    PROVIDER_BYTES: "Decoded payload bytes received from upstream data providers.",
+}
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: dict) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram (count per bucket, sum, count and max).
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count", "max")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimates a quantile by linear interpolation inside its bucket (like PromQL histogram_quantile).
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            if n and cumulative + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - cumulative) / n, self.max)
+            cumulative += n
+        return self.max
+
+
+class MetricsRegistry:
+    """
+    Thread-safe, in-process store of counters and latency histograms.
+
+    Series are identified by a metric name plus labels (e.g. stage='load_candles',
+    source='binance'). A disabled registry ignores every update, so instrumented code
+    costs one attribute check per call. Snapshots are plain dicts, which lets worker
+    processes send theirs back to the parent to be merged.
+    """
+
+    def __init__(self, enabled: bool = False, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.started_at = time.time()
+        self._counters: Dict[LabelKey, float] = {}
+        self._histograms: Dict[LabelKey, Histogram] = {}
+        self._lock = threading.Lock()
+
+    # --- Recording ---
+    def inc(self, name: str, value: float = 1, **labels):
+        """
+        Adds `value` to a counter.
+        """
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """
+        Records one observation (seconds) in a histogram.
+        """
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def record_stage(self, stage: str, seconds: float, failed: bool = False, **labels):
+        self.observe(STAGE_SECONDS, seconds, stage=stage, **labels)
+        if failed:
+            self.inc(STAGE_ERRORS, stage=stage, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    # --- Snapshots ---
+    def snapshot(self) -> dict:
+        """
+        Returns every series as a JSON-serializable dict (see merge()).
+        """
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> dict:
+        return {
+            "started_at": self.started_at,
+            "buckets": list(self.buckets),
+            "counters": [{"name": name, "labels": dict(labels), "value": value}
+                         for (name, labels), value in self._counters.items()],
+            "histograms": [{"name": name, "labels": dict(labels), "counts": list(h.counts),
+                            "sum": h.sum, "count": h.count, "max": h.max}
+                           for (name, labels), h in self._histograms.items()],
+        }
+
+    def drain(self) -> dict:
+        """
+        Atomically takes a snapshot and resets the registry (for per-chunk worker reports).
+        """
+        with self._lock:
+            snapshot = self._snapshot()
+            self._counters.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+            return snapshot
+
+    def merge(self, snapshot: dict):
+        """
+        Adds another registry's snapshot (e.g. from a worker process) into this one.
+
+        Raises:
+            ValueError: If the snapshot's histograms use different buckets.
+        """
+        if snapshot.get("histograms") and tuple(snapshot["buckets"]) != self.buckets:
+            raise ValueError("Cannot merge histograms with different buckets")
+        with self._lock:
+            self.started_at = min(self.started_at, snapshot.get("started_at", self.started_at))
+            for row in snapshot.get("counters", []):
+                key = _key(row["name"], row["labels"])
+                self._counters[key] = self._counters.get(key, 0) + row["value"]
+            for row in snapshot.get("histograms", []):
+                key = _key(row["name"], row["labels"])
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(self.buckets)
+                histogram.counts = [a + b for a, b in zip(histogram.counts, row["counts"])]
+                histogram.sum += row["sum"]
+                histogram.count += row["count"]
+                histogram.max = max(histogram.max, row["max"])
+
+    # --- Summaries ---
+    def stage_summary(self) -> List[dict]:
+        """
+        Per-stage latency rows (calls, errors, mean / p50 / p95 / max in ms), slowest total first.
+        """
+        with self._lock:
+            errors = {labels: value for (name, labels), value in self._counters.items() if name == STAGE_ERRORS}
+            rows = []
+            for (name, labels), h in self._histograms.items():
+                if name != STAGE_SECONDS or h.count == 0:
+                    continue
+                label_dict = dict(labels)
+                stage = label_dict.pop("stage", "")
+                rows.append({
+                    "stage": stage,
+                    "labels": ", ".join(f"{k}={v}" for k, v in label_dict.items()),
+                    "calls": h.count,
+                    "errors": int(errors.get(labels, 0)),
+                    "total_s": round(h.sum, 3),
+                    "mean_ms": round(1000 * h.sum / h.count, 2),
+                    "p50_ms": round(1000 * h.quantile(0.5), 2),
+                    "p95_ms": round(1000 * h.quantile(0.95), 2),
+                    "max_ms": round(1000 * h.max, 2),
+                })
+        return sorted(rows, key=lambda r: r["total_s"], reverse=True)
+
+    def counter_totals(self, name: str, by: str) -> Dict[str, float]:
+        """
+        Sums a counter over all series, grouped by one label (e.g. PROVIDER_BYTES by 'provider').
+        """
+        totals = {}
+        with self._lock:
+            for (metric, labels), value in self._counters.items():
+                if metric == name:
+                    group = dict(labels).get(by, "")
+                    totals[group] = totals.get(group, 0) + value
+        return totals
+
+    def cache_hit_rates(self) -> Dict[str, dict]:
+        """
+        Returns:
+            dict: cache name -> {'hits', 'misses', 'hit_rate'} (plus any other result counts).
+        """
+        caches = {}
+        with self._lock:
+            for (metric, labels), value in self._counters.items():
+                if metric == CACHE_REQUESTS:
+                    label_dict = dict(labels)
+                    results = caches.setdefault(label_dict.get("cache", ""), {"hits": 0, "misses": 0})
+                    result = {"hit": "hits", "miss": "misses"}.get(label_dict.get("result"), label_dict.get("result"))
+                    results[result] = results.get(result, 0) + value
+        for results in caches.values():
+            lookups = results["hits"] + results["misses"]
+            results["hit_rate"] = results["hits"] / lookups if lookups else None
+        return caches
+
+    # --- Export ---
+    def to_prometheus(self) -> str:
+        """
+        Renders every series in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# HELP {METRIC_PREFIX}{name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+
+        for row in sorted(snapshot["counters"], key=lambda r: (r["name"], sorted(r["labels"].items()))):
+            header(row["name"], "counter")
+            lines.append(f"{METRIC_PREFIX}{row['name']}{_format_labels(row['labels'])} {_format_value(row['value'])}")
+
+        bounds = [_format_value(b) for b in snapshot["buckets"]] + ["+Inf"]
+        for row in sorted(snapshot["histograms"], key=lambda r: (r["name"], sorted(r["labels"].items()))):
+            name = METRIC_PREFIX + row["name"]
+            header(row["name"], "histogram")
+            cumulative = 0
+            for bound, n in zip(bounds, row["counts"]):
+                cumulative += n
+                lines.append(f"{name}_bucket{_format_labels(row['labels'], le=bound)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(row['labels'])} {_format_value(row['sum'])}")
+            lines.append(f"{name}_count{_format_labels(row['labels'])} {row['count']}")
+        return "\n".join(lines) + "\n"
+
+    def to_jsonl(self) -> str:
+        """
+        Renders every series as one JSON object per line, stamped with the current time.
+        """
+        snapshot = self.snapshot()
+        now = time.time()
+        lines = [json.dumps({"ts": now, "type": "counter", **row}) for row in snapshot["counters"]]
+        for row in snapshot["histograms"]:
+            lines.append(json.dumps({"ts": now, "type": "histogram", "buckets": snapshot["buckets"], **row}))
+        return "".join(line + "\n" for line in lines)
+
+    def write(self, path: str, fmt: Optional[str] = None):
+        """
+        Writes the metrics to a file: Prometheus text for '.prom' / '.txt' (or fmt='prometheus'),
+        JSON lines otherwise.
+        """
+        fmt = fmt or ("prometheus" if path.endswith((".prom", ".txt")) else "jsonl")
+        text = self.to_prometheus() if fmt == "prometheus" else self.to_jsonl()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict, **extra) -> str:
+    items = list(labels.items()) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in items) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+# --- Process-wide Registry ---
+
+_registry = MetricsRegistry(enabled=os.environ.get("FIBOBOT_METRICS", "") not in ("", "0"))
+
+
+def get_registry() -> MetricsRegistry:
+    return _registry
+
+
+def enable():
+    _registry.enabled = True
+
+
+def disable():
+    _registry.enabled = False
+
+
+def is_enabled() -> bool:
+    return _registry.enabled
+
+
+def inc(name: str, value: float = 1, **labels):
+    _registry.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    _registry.observe(name, value, **labels)
+
+
+class timed:
+    """
+    Times a stage into the STAGE_SECONDS histogram; works as a decorator or a context manager.
+
+        @timed("model_predict")
+        def predict_many(...): ...
+
+        with timed("provider_fetch", provider="binance"):
+            rows = fetch(...)
+
+    While metrics are disabled the wrapped call runs directly and nothing is recorded.
+    Exceptions propagate unchanged and are also counted in STAGE_ERRORS.
+    """
+
+    __slots__ = ("stage", "labels", "_start")
+
+    def __init__(self, stage: str, **labels):
+        self.stage = stage
+        self.labels = labels
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter() if _registry.enabled else None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._start is not None:
+            _registry.record_stage(self.stage, time.perf_counter() - self._start, exc_type is not None, **self.labels)
+        return False
+
+    def __call__(self, fn):
+        stage, labels = self.stage, self.labels
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _registry.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                _registry.record_stage(stage, time.perf_counter() - start, failed, **labels)
+        return wrapper
@@ -0,0 +1,261 @@
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from core.fibonacci_utils import FIB_LABELS, FIB_RATIOS, fibonacci_level_grid
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Pivot kinds stored in the 'kind' field
+PIVOT_HIGH = 1
+PIVOT_LOW = -1
+
+# Default reversal: a 5% move against the running extreme confirms it as a pivot
+DEFAULT_THRESHOLD = 0.05
+
+# One pivot = 17 bytes, so a million pivots (thousands of symbols) take ~17 MB
+PIVOT_DTYPE = np.dtype([
+    ('index', '<i4'),       # Bar of the swing high / low
+    ('confirmed', '<i4'),   # Bar at which the reversal confirmed it (first bar it is known)
+    ('price', '<f8'),       # Swing high / low price
+    ('kind', 'i1'),         # PIVOT_HIGH or PIVOT_LOW
+])
+
+
+def average_true_range(high, low, close, period: int = 14) -> np.ndarray:
+    """
+    Simple moving average of the true range over `period` bars.
+
+    Returns:
+        np.ndarray: ATR per bar; the first `period - 1` bars are NaN.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+
+    prev_close = np.r_[close[:1], close[:-1]]
+    true_range = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+    atr = np.full(len(true_range), np.nan)
+    if len(true_range) >= period:
+        sums = np.cumsum(np.r_[0.0, true_range])
+        atr[period - 1:] = (sums[period:] - sums[:-period]) / period
+    return atr
+
+
+def zigzag_pivots(high, low, threshold: float = DEFAULT_THRESHOLD, atr=None, atr_multiple: float = 3.0) -> np.ndarray:
+    """
+    Finds alternating swing highs and lows in a single pass over the bars (ZigZag).
+
+    The running extreme of the current leg becomes a pivot once price reverses from it by
+    the reversal distance: `threshold` x price, or `atr_multiple` x ATR when `atr` is given.
+    Pivots are only reported once confirmed and the decision at bar t uses bars <= t only,
+    so `confirmed` is the first bar at which a pivot may be used without look-ahead.
+
+    Args:
+        high (array-like): High prices, shape (bars,).
+        low (array-like): Low prices, shape (bars,).
+        threshold (float): Reversal as a fraction of the pivot price (e.g., 0.05 = 5%).
+        atr (array-like, optional): Per-bar ATR; switches to an ATR-based reversal.
+            Bars where it is NaN never confirm a pivot.
+        atr_multiple (float): Reversal in ATRs when `atr` is given.
+
+    Returns:
+        np.ndarray: PIVOT_DTYPE records ordered by bar, alternating highs and lows.
+    """
+    highs = np.asarray(high, dtype=np.float64).tolist()
+    lows = np.asarray(low, dtype=np.float64).tolist()
+    if atr is not None:
+        reversals = (np.asarray(atr, dtype=np.float64) * atr_multiple).tolist()
+
+    pivots = []
+    trend = 0                    # +1 while tracking a swing high, -1 while tracking a swing low
+    hi_idx = lo_idx = 0
+    hi = lo = None
+
+    for i, (h, l) in enumerate(zip(highs, lows)):
+        if h != h or l != l:     # Skip NaN bars
+            continue
+        if hi is None:
+            hi, lo, hi_idx, lo_idx = h, l, i, i
+            continue
+
+        if trend >= 0 and h > hi:
+            hi, hi_idx = h, i
+        if trend <= 0 and l < lo:
+            lo, lo_idx = l, i
+
+        if atr is None:
+            up_rev, down_rev = threshold * lo, threshold * hi
+        else:
+            up_rev = down_rev = reversals[i]
+
+        if trend >= 0 and hi - l >= down_rev and hi_idx < i:
+            # Price fell far enough below the running high: the high is a pivot
+            pivots.append((hi_idx, i, hi, PIVOT_HIGH))
+            trend, lo, lo_idx = -1, l, i
+        elif trend <= 0 and h - lo >= up_rev and lo_idx < i:
+            # Price rose far enough above the running low: the low is a pivot
+            pivots.append((lo_idx, i, lo, PIVOT_LOW))
+            trend, hi, hi_idx = 1, h, i
+
+    return np.array(pivots, dtype=PIVOT_DTYPE)
+
+
+# --- Swing Legs & Retracement Grids ---
+
+class SwingGrids(NamedTuple):
+    """
+    One retracement grid per swing leg (the move between two consecutive pivots).
+
+    Levels are measured back from the leg's end: for an up leg (low -> high) ratio 0 is the
+    high and 1 the low, for a down leg (high -> low) ratio 0 is the low and 1 the high.
+    A grid is in force from bar `active_from` (when its end pivot was confirmed) on.
+    """
+    start: np.ndarray        # int32   - bar of the leg's first pivot
+    end: np.ndarray          # int32   - bar of the leg's last pivot
+    active_from: np.ndarray  # int32   - bar at which the leg became known
+    high: np.ndarray         # float64 - top of the leg
+    low: np.ndarray          # float64 - bottom of the leg
+    direction: np.ndarray    # int8    - +1 up leg, -1 down leg
+    levels: np.ndarray       # float64 - shape (legs, len(ratios))
+
+    def __len__(self):
+        return len(self.start)
+
+
+def swing_grids(pivots: np.ndarray, ratios=FIB_RATIOS) -> SwingGrids:
+    """
+    Builds the retracement grid of every swing leg between consecutive pivots.
+
+    Returns:
+        SwingGrids: One row per leg, ordered by `active_from`.
+    """
+    first, last = pivots[:-1], pivots[1:]
+    direction = np.where(last['kind'] == PIVOT_HIGH, 1, -1).astype(np.int8)
+    high = np.where(direction > 0, last['price'], first['price'])
+    low = np.where(direction > 0, first['price'], last['price'])
+
+    # Grid from the leg's end back towards its start
+    origin = np.where(direction > 0, high, low)
+    target = np.where(direction > 0, low, high)
+    return SwingGrids(
+        start=first['index'].astype(np.int32),
+        end=last['index'].astype(np.int32),
+        active_from=last['confirmed'].astype(np.int32),
+        high=high,
+        low=low,
+        direction=direction,
+        levels=fibonacci_level_grid(origin, target, ratios).reshape(len(direction), len(ratios)),
+    )
+
+
+def active_legs(grids: SwingGrids, n_bars: int, count: int = 3) -> np.ndarray:
+    """
+    Time index of the grids in force: for every bar, the ids of the `count` most recent legs.
+
+    Returns:
+        np.ndarray: int32 array of shape (n_bars, count); column 0 is the latest leg,
+            -1 where fewer legs were known at that bar.
+    """
+    latest = np.searchsorted(grids.active_from, np.arange(n_bars), side='right') - 1
+    legs = latest[:, None] - np.arange(count)[None, :]
+    legs[legs < 0] = -1
+    legs[latest < 0] = -1
+    return legs.astype(np.int32)
+
+
+def active_level_grid(grids: SwingGrids, n_bars: int, count: int = 3) -> np.ndarray:
+    """
+    Per-bar levels of the `count` most recent legs (point-in-time: no look-ahead).
+
+    Returns:
+        np.ndarray: Shape (n_bars, count, len(ratios)); NaN where no leg was known.
+    """
+    legs = active_legs(grids, n_bars, count)
+    out = np.full(legs.shape + (grids.levels.shape[1],), np.nan)
+    known = legs >= 0
+    out[known] = grids.levels[legs[known]]
+    return out
+
+
+def swing_levels(high, low, count: int = 3, threshold: float = DEFAULT_THRESHOLD,
+                 atr=None, atr_multiple: float = 3.0) -> List[Dict[str, float]]:
+    """
+    Fibonacci levels of the most recent swing legs, newest first, as label -> price dicts.
+
+    Falls back to the global high/low of the series (a single grid) when fewer than two
+    pivots have been confirmed, matching the previous whole-window behaviour.
+
+    Returns:
+        list: Up to `count` level dicts (empty if the series is empty).
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    if len(high) == 0:
+        return []
+
+    pivots = zigzag_pivots(high, low, threshold, atr, atr_multiple)
+    if len(pivots) < 2:
+        grid = fibonacci_level_grid(np.nanmax(high), np.nanmin(low))
+        return [{label: float(level) for label, level in zip(FIB_LABELS, grid)}]
+
+    grids = swing_grids(pivots)
+    return [{label: float(level) for label, level in zip(FIB_LABELS, grids.levels[leg])}
+            for leg in range(len(grids) - 1, max(len(grids) - 1 - count, -1), -1)]
+
+
+# --- Compact Multi-Symbol Storage ---
+
+class PivotStore:
+    """
+    Pivots of many symbols packed into one PIVOT_DTYPE array with per-symbol offsets.
+
+    get() returns zero-copy views, so thousands of symbols cost one allocation
+    plus 17 bytes per pivot.
+    """
+
+    def __init__(self, pivots: np.ndarray, offsets: Dict[str, Tuple[int, int]]):
+        self.pivots = pivots
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, series: Iterable[Tuple[str, np.ndarray]]) -> "PivotStore":
+        """
+        Args:
+            series (iterable): (symbol, PIVOT_DTYPE array) pairs.
+        """
+        parts, offsets, position = [], {}, 0
+        for symbol, pivots in series:
+            offsets[symbol] = (position, position + len(pivots))
+            parts.append(np.asarray(pivots, dtype=PIVOT_DTYPE))
+            position += len(pivots)
+        packed = np.concatenate(parts) if parts else np.empty(0, dtype=PIVOT_DTYPE)
+        return cls(packed, offsets)
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, "pd.DataFrame"], threshold: float = DEFAULT_THRESHOLD) -> "PivotStore":
+        """
+        Runs zigzag_pivots over each symbol's High/Low columns and packs the results.
+        """
+        return cls.build((symbol, zigzag_pivots(df['High'].to_numpy(), df['Low'].to_numpy(), threshold))
+                         for symbol, df in frames.items())
+
+    def get(self, symbol: str) -> Optional[np.ndarray]:
+        span = self.offsets.get(symbol)
+        return None if span is None else self.pivots[span[0]:span[1]]
+
+    def grids(self, symbol: str, ratios=FIB_RATIOS) -> Optional[SwingGrids]:
+        pivots = self.get(symbol)
+        return None if pivots is None else swing_grids(pivots, ratios)
+
+    @property
+    def nbytes(self) -> int:
+        return self.pivots.nbytes
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, symbol):
+        return symbol in self.offsets
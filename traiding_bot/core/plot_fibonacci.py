@@ -1,17 +1,38 @@
-import ccxt
-import plotly.graph_objects as go
+from typing import Dict, List, NamedTuple, Optional
+
 import pandas as pd
-import streamlit as st
-from core.fibonacci_utils import calculate_fibonacci_levels
+from core.chart_rendering import MarkerSet
+from core.crossings import UP, detect_crossings, detect_threshold_breaches
+from core.data_sources import DataFetchError, load_candles
+from core.metrics import timed
+from core.pivots import DEFAULT_THRESHOLD, swing_levels
+
+
+class FibonacciAnalysis(NamedTuple):
+    """
+    Everything needed to draw a Fibonacci chart, computed without any UI dependency.
+
+    `levels` is the grid of the latest swing leg and `older_levels` those of the legs before it.
+    `warning` is set (and levels/markers are empty) when there is nothing to analyze.
+    """
+    data: pd.DataFrame
+    levels: Dict[str, float]
+    markers: List[MarkerSet]
+    warning: Optional[str] = None
+    older_levels: List[Dict[str, float]] = []
+
 
 class FibonacciPlotter:
     """
     Handles the fetching, processing, and visualization of cryptocurrency data.
     It overlays Fibonacci retracement levels on a Candlestick chart and annotates
     potential Buy/Sell signals based on price breakouts.
+
+    fetch_data() and analyze() are pure data/compute steps that raise or return results;
+    only plot() touches Streamlit, so workers can reuse the analysis without the UI stack.
     """
 
-    def __init__(self, symbol='XRP/USDT', timeframe='1h', limit=100):
+    def __init__(self, symbol='XRP/USDT', timeframe='1h', limit=100, threshold=DEFAULT_THRESHOLD, legs=3):
         """
         Initializes the plotter settings.
 
@@ -19,117 +40,123 @@ class FibonacciPlotter:
             symbol (str): The trading pair (e.g., 'XRP/USDT').
             timeframe (str): Data resolution (e.g., '1h', '1d').
             limit (int): Number of candles to fetch.
+            threshold (float): ZigZag reversal that confirms a swing pivot (fraction of price).
+            legs (int): Number of recent swing legs whose grids are drawn.
         """
         self.symbol = symbol
         self.timeframe = timeframe
         self.limit = limit
+        self.threshold = threshold
+        self.legs = legs
 
     def fetch_data(self) -> pd.DataFrame:
         """
-        Connects to Binance API to retrieve historical OHLCV data.
-        
+        Retrieves historical OHLCV data from Binance through the local candle cache.
+        Only candles newer than the last stored one are requested from the API, and
+        coarser timeframes are resampled from the stored 1h series when possible.
+
         Returns:
             pd.DataFrame: A DataFrame containing Timestamp, Open, High, Low, Close, Volume.
+
+        Raises:
+            DataFetchError: If the candles could not be retrieved.
         """
         try:
-            exchange = ccxt.binance()
-            # Fetching candles
-            ohlcv = exchange.fetch_ohlcv(self.symbol, timeframe=self.timeframe, limit=500)
-            # Converting to DataFrame
-            df = pd.DataFrame(ohlcv, columns=['Timestamp', 'Open', 'High', 'Low', 'Close', 'Volume'])
-            df['Datetime'] = pd.to_datetime(df['Timestamp'], unit='ms')
-            return df
+            return load_candles('binance', self.symbol, self.timeframe, limit=self.limit)
         except Exception as e:
-            st.error(f"Error fetching data from Binance: {e}")
-            return pd.DataFrame()
+            raise DataFetchError(f"Error fetching data from Binance: {e}") from e
 
-    def plot(self):
+    @timed("analyze", plotter="fibonacci")
+    def analyze(self, data: Optional[pd.DataFrame] = None) -> FibonacciAnalysis:
         """
-        Main method to render the interactive Plotly chart in Streamlit.
-        Calculates Fibonacci levels and adds annotations for trade signals.
-        """
-        data = self.fetch_data()
+        Calculates Fibonacci levels and the Buy/Sell signal markers.
 
-        # Display raw data table for transparency
-        st.subheader(f"📊 Raw Data for {self.symbol}")
-        st.write(data.head(10))
+        Args:
+            data (pd.DataFrame, optional): Candles to analyze; fetched when omitted.
+
+        Returns:
+            FibonacciAnalysis: Cleaned candles, levels and markers (or a warning).
+        """
+        if data is None:
+            data = self.fetch_data()
 
         # Data Validation
         if data.empty:
-            st.warning("⚠️ No data found!")
-            return
+            return FibonacciAnalysis(data, {}, [], "⚠️ No data found!")
 
         data = data.dropna(subset=["Open", "High", "Low", "Close"])
         if data.empty:
-            st.warning("⚠️ Data is missing OHLC values!")
-            return
+            return FibonacciAnalysis(data, {}, [], "⚠️ Data is missing OHLC values!")
 
         # --- Fibonacci Calculation ---
-        high = data['High'].max()
-        low = data['Low'].min()
-        levels = calculate_fibonacci_levels(high, low)
-
-        # --- Chart Construction ---
-        fig = go.Figure(data=[go.Candlestick(
-            x=data['Datetime'],
-            open=data['Open'],
-            high=data['High'],
-            low=data['Low'],
-            close=data['Close'],
-            name="Price"
-        )])
-
-        # Draw Fibonacci Lines
-        for label, level in levels.items():
-            fig.add_hline(y=float(level), line_dash="dash", annotation_text=label, line_color="blue")
+        # One grid per recent ZigZag swing leg (whole-window range until a leg is confirmed)
+        grids = swing_levels(data['High'].to_numpy(), data['Low'].to_numpy(), count=self.legs, threshold=self.threshold)
+        levels = grids[0]
 
         # --- Signal Logic: Breakout Detection ---
-        # Iterating through history to find where price crossed a Fibonacci level
-        for i in range(1, len(data)):
-            current_price = data["Close"].iloc[i]
-            previous_price = data["Close"].iloc[i - 1]
-            time = data["Datetime"].iloc[i]
-
-            for label, level_price in levels.items():
-                # Detect Bullish Breakout (Crossing Up)
-                if previous_price < level_price and current_price > level_price:
-                    fig.add_annotation(
-                        x=time, y=current_price,
-                        text="BUY", showarrow=True, arrowhead=2, arrowsize=1,
-                        arrowcolor="green", font=dict(color="green", size=10),
-                        ax=0, ay=-30
-                    )
-                # Detect Bearish Breakout (Crossing Down)
-                elif previous_price > level_price and current_price < level_price:
-                    fig.add_annotation(
-                        x=time, y=current_price,
-                        text="SELL", showarrow=True, arrowhead=2, arrowsize=1,
-                        arrowcolor="red", font=dict(color="red", size=10),
-                        ax=0, ay=30
-                    )
+        # All crossings of every Fibonacci level are computed at once by the crossing engine
+        close = data["Close"].to_numpy()
+        times = data["Datetime"].to_numpy()
+        events = detect_crossings(close, list(levels.values()))
+        buys = events.index[events.direction == UP]    # Bullish Breakout (Crossing Up)
+        sells = events.index[events.direction != UP]   # Bearish Breakout (Crossing Down)
 
         # --- Custom Strategy Alerts (Hardcoded Levels) ---
         # Note: In a production environment, these levels should be dynamic parameters.
-        for i in range(len(data)):
-            price = data["Close"].iloc[i]
-            time = data["Datetime"].iloc[i]
-
-            if price > 3.30:
-                fig.add_annotation(
-                    x=time, y=price,
-                    text="📈 ניסיון פריצה – שקול כניסה", # "Attempting Breakout - Consider Entry"
-                    showarrow=True, arrowhead=2, arrowsize=1.5,
-                    arrowcolor="green", font=dict(color="green", size=10),
-                    ax=0, ay=-40,
-                )
-            elif price < 2.98:
-                fig.add_annotation(
-                    x=time, y=price,
-                    text="⚠ מחיר מתחת 2.98 – צא או המתן", # "Price below 2.98 - Exit or Wait"
-                    showarrow=True, arrowhead=2, arrowsize=1.5,
-                    arrowcolor="red", font=dict(color="red", size=10),
-                    ax=0, ay=40,
-                )
+        above, below = detect_threshold_breaches(close, upper=3.30, lower=2.98)
+
+        markers = [
+            MarkerSet(times[buys], close[buys], "BUY", "green", "triangle-up"),
+            MarkerSet(times[sells], close[sells], "SELL", "red", "triangle-down"),
+            MarkerSet(times[above], close[above], "📈 ניסיון פריצה – שקול כניסה", "green", "star"),  # "Attempting Breakout - Consider Entry"
+            MarkerSet(times[below], close[below], "⚠ מחיר מתחת 2.98 – צא או המתן", "red", "x"),     # "Price below 2.98 - Exit or Wait"
+        ]
+        return FibonacciAnalysis(data, levels, markers, older_levels=grids[1:])
+
+    def build_figure(self, analysis: FibonacciAnalysis):
+        """
+        Builds the Plotly chart for an analysis (Plotly is imported on first use).
+
+        Returns:
+            go.Figure: Candles downsampled to the chart width, with all signals as WebGL traces.
+        """
+        from core.chart_rendering import build_fibonacci_figure
+
+        return build_fibonacci_figure(analysis.data, analysis.levels, markers=analysis.markers, name="Price",
+                                      older_levels=analysis.older_levels)
+
+    def plot(self, analysis: Optional[FibonacciAnalysis] = None):
+        """
+        Main method to render the interactive Plotly chart in Streamlit.
+        Calculates Fibonacci levels and adds annotations for trade signals.
+
+        Args:
+            analysis (FibonacciAnalysis, optional): Precomputed (e.g. cached) analysis;
+                fetched and computed when omitted.
+
+        Returns:
+            pd.DataFrame: The candles that were plotted (empty if nothing could be fetched).
+        """
+        import streamlit as st
+
+        if analysis is None:
+            try:
+                data = self.fetch_data()
+            except DataFetchError as e:
+                st.error(str(e))
+                data = pd.DataFrame()
+            analysis = self.analyze(data)
+        else:
+            data = analysis.data
+
+        # Display raw data table for transparency
+        st.subheader(f"📊 Raw Data for {self.symbol}")
+        st.write(data.head(10))
+
+        if analysis.warning:
+            st.warning(analysis.warning)
+            return analysis.data
 
         # Render the final chart
-        st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+        st.plotly_chart(self.build_figure(analysis), use_container_width=True)
+        return analysis.data
@@ -0,0 +1,179 @@
+"""
+📼 Local Candle Replay Server
+
+Streams stored OHLCV series from the candle cache over a websocket, so the live feed
+(core.live_feed) and the dashboard can be developed and load-tested without network access.
+
+All symbols share one clock: every message carries the candles of every symbol for one
+timestamp, optionally preceded by in-progress updates of the same bars.
+
+Usage (from the traiding_bot directory):
+    python -m core.replay_server --source binance --symbols XRP/USDT BTC/USDT --timeframe 1h --speed 3600
+    python -m core.replay_server --symbols XRP/USDT --interval 0.1 --ticks 5 --loop
+
+Message format (JSON):
+    {"type": "candles", "t": 1700000000000,
+     "candles": [{"s": "XRP/USDT", "t": 1700000000000, "o": ..., "h": ..., "l": ..., "c": ..., "v": ..., "x": true}]}
+    "x" is true once the bar is closed. A client may pass "?symbols=XRP/USDT,BTC/USDT" in
+    the URL to receive only those symbols.
+
+Author: Elinor Srur
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from core.candle_cache import CandleCache, get_default_cache
+from core.timeframes import timeframe_to_ms
+
+
+def _candle_message(symbol: str, record, closed: bool = True) -> dict:
+    ts, o, h, l, c, v = record
+    return {"s": symbol, "t": int(ts), "o": o, "h": h, "l": l, "c": c, "v": v, "x": closed}
+
+
+def partial_updates(symbol: str, record, ticks: int) -> List[dict]:
+    """
+    Splits one bar into `ticks` updates: ticks - 1 in-progress states with the close walking
+    from the open towards the final close, then the closed bar.
+    """
+    ts, o, h, l, c, v = record
+    updates = []
+    for k in range(1, ticks):
+        frac = k / ticks
+        close = o + (c - o) * frac
+        updates.append(_candle_message(
+            symbol, (ts, o, max(o, close), min(o, close), close, v * frac), closed=False))
+    updates.append(_candle_message(symbol, record))
+    return updates
+
+
+class ReplaySource:
+    """
+    Merges stored series of many symbols into one timestamp-ordered stream.
+    """
+
+    def __init__(self, source: str, symbols: List[str], timeframe: str, cache: Optional[CandleCache] = None,
+                 start: Optional[int] = None):
+        cache = cache or get_default_cache()
+        self.timeframe = timeframe
+        self.series: Dict[str, np.ndarray] = {}
+        for symbol in symbols:
+            records = cache.read(source, symbol, timeframe)
+            if start is not None:
+                records = records[int(records['Timestamp'].searchsorted(start)):]
+            self.series[symbol] = records
+
+        stamps = [records['Timestamp'] for records in self.series.values() if len(records)]
+        self.timestamps = np.unique(np.concatenate(stamps)) if stamps else np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def bars(self, symbols: Optional[set] = None) -> Iterator[tuple]:
+        """
+        Yields (timestamp, [(symbol, record), ...]) for every timestamp of the merged stream.
+        """
+        positions = {symbol: 0 for symbol in self.series}
+        for ts in self.timestamps.tolist():
+            batch = []
+            for symbol, records in self.series.items():
+                i = positions[symbol]
+                if i < len(records) and records['Timestamp'][i] == ts:
+                    positions[symbol] = i + 1
+                    if symbols is None or symbol in symbols:
+                        batch.append((symbol, tuple(records[i].tolist())))
+            yield ts, batch
+
+
+class ReplayServer:
+    """
+    Websocket server replaying a ReplaySource to every client at a configurable pace.
+
+    Each client gets its own replay from the first stored bar.
+    """
+
+    def __init__(self, replay: ReplaySource, interval: float = 1.0, ticks: int = 1, loop: bool = False):
+        """
+        Args:
+            replay (ReplaySource): Stored series to stream.
+            interval (float): Seconds of wall-clock time per bar (0 = as fast as possible).
+            ticks (int): Updates per bar; values above 1 add in-progress updates before the close.
+            loop (bool): Restart from the first bar at the end of the data.
+        """
+        self.replay = replay
+        self.interval = interval
+        self.ticks = max(1, ticks)
+        self.loop = loop
+
+    @staticmethod
+    def _requested_symbols(websocket) -> Optional[set]:
+        # websockets >= 13 exposes the handshake as `request`, older versions as `path`
+        request = getattr(websocket, "request", None)
+        path = request.path if request is not None else getattr(websocket, "path", "")
+        symbols = parse_qs(urlparse(path).query).get("symbols")
+        return set(",".join(symbols).split(",")) if symbols else None
+
+    async def handler(self, websocket):
+        symbols = self._requested_symbols(websocket)
+        pause = self.interval / self.ticks
+        while True:
+            for ts, batch in self.replay.bars(symbols):
+                if not batch:
+                    continue
+                updates = [partial_updates(symbol, record, self.ticks) for symbol, record in batch]
+                for k in range(self.ticks):
+                    await websocket.send(json.dumps({"type": "candles", "t": ts,
+                                                     "candles": [u[k] for u in updates]}))
+                    await asyncio.sleep(pause)
+            if not self.loop:
+                await websocket.send(json.dumps({"type": "end"}))
+                return
+
+    async def serve(self, host: str = "localhost", port: int = 8765):
+        import websockets
+
+        async with websockets.serve(self.handler, host, port):
+            print(f"📼 Replaying {len(self.replay)} bars of {len(self.replay.series)} symbols on ws://{host}:{port}")
+            await asyncio.Future()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay stored candles over a websocket.")
+    parser.add_argument("--source", default="binance", help="Candle cache source (default: binance)")
+    parser.add_argument("--symbols", nargs="+", required=True, help="Symbols to replay, e.g. XRP/USDT")
+    parser.add_argument("--timeframe", default="1h", help="Stored timeframe to replay (default: 1h)")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="Replay speed as a multiple of real time, e.g. 3600 = one 1h bar per second")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds per bar when --speed is not given")
+    parser.add_argument("--ticks", type=int, default=1, help="Updates per bar (in-progress updates before the close)")
+    parser.add_argument("--loop", action="store_true", help="Restart at the end of the data")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    interval = timeframe_to_ms(args.timeframe) / 1000 / args.speed if args.speed else args.interval
+
+    replay = ReplaySource(args.source, args.symbols, args.timeframe)
+    if len(replay) == 0:
+        print("❌ No stored candles for these symbols; load them once (e.g. via main.py) first.")
+        return 2
+
+    server = ReplayServer(replay, interval=interval, ticks=args.ticks, loop=args.loop)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
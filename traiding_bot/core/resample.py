@@ -0,0 +1,133 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from core.candle_cache import CANDLE_DTYPE, frame_to_records, records_to_frame
+from core.timeframes import timeframe_to_ms
+
+_MINUTE_MS = 60_000
+_DAY_MS = 86_400_000
+
+
+class Session(NamedTuple):
+    """
+    Trading-session alignment used when building coarser bars.
+
+    Intraday bars (e.g. 4h) are aligned to `open_minutes` after local midnight,
+    daily and weekly bars to the local calendar day / Monday.
+    """
+    tz: str
+    open_minutes: int = 0
+
+
+SESSIONS = {
+    "crypto": Session("UTC", 0),                    # 24/7, bars aligned to UTC midnight
+    "america": Session("America/New_York", 570),    # NYSE / NASDAQ regular session opens 09:30
+}
+
+# Session used for each data source of core.data_sources
+SOURCE_SESSIONS = {
+    "binance": "crypto",
+    "yfinance": "america",
+}
+
+
+def _local_ms(timestamps: np.ndarray, tz: str) -> np.ndarray:
+    """
+    Converts UTC epoch milliseconds to local wall-clock milliseconds (DST aware).
+    """
+    if tz == "UTC":
+        return timestamps
+    idx = pd.DatetimeIndex(pd.to_datetime(timestamps, unit="ms", utc=True)).tz_convert(tz).tz_localize(None)
+    return idx.as_unit("ms").asi8
+
+
+def bucket_starts(timestamps, timeframe: str, session: Session = SESSIONS["crypto"]) -> np.ndarray:
+    """
+    Assigns every candle to the coarser bar it belongs to.
+
+    Args:
+        timestamps (array-like): Candle open times, UTC epoch milliseconds, sorted.
+        timeframe (str): Target resolution ('4h', '1d', '1wk', '1mo', ...).
+        session (Session): Exchange session alignment.
+
+    Returns:
+        np.ndarray: Local wall-clock start (ms) of each candle's bar; candles sharing
+            a value belong to the same bar.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    local = _local_ms(timestamps, session.tz)
+    day = local // _DAY_MS
+
+    unit = timeframe.lstrip("0123456789")
+    count = int(timeframe[:len(timeframe) - len(unit)] or 1)
+
+    if unit in ("mo", "M"):
+        # Calendar months
+        months = local.astype("datetime64[ms]").astype("datetime64[M]").astype(np.int64)
+        return ((months // count) * count).astype("datetime64[M]").astype("datetime64[ms]").astype(np.int64)
+    if unit in ("wk", "w"):
+        # Weeks start on Monday (epoch day 0 was a Thursday)
+        return (((day + 3) // (7 * count)) * 7 * count - 3) * _DAY_MS
+
+    tf_ms = timeframe_to_ms(timeframe)
+    if tf_ms % _DAY_MS == 0:
+        return (day // (tf_ms // _DAY_MS)) * tf_ms
+
+    # Intraday bars are counted from the session open of each local day
+    open_ms = session.open_minutes * _MINUTE_MS
+    slot = (local - day * _DAY_MS - open_ms) // tf_ms
+    return day * _DAY_MS + open_ms + slot * tf_ms
+
+
+def resample_records(records: np.ndarray, timeframe: str, session: Session = SESSIONS["crypto"]) -> np.ndarray:
+    """
+    Aggregates candle records into coarser bars.
+
+    Open = first open, High = max high, Low = min low, Close = last close, Volume = sum.
+    The resulting Timestamp is the bar's nominal start (session-aligned) in UTC.
+
+    Args:
+        records (np.ndarray): Sorted CANDLE_DTYPE records at the finer resolution.
+        timeframe (str): Target resolution.
+        session (Session): Exchange session alignment.
+
+    Returns:
+        np.ndarray: CANDLE_DTYPE records at the target resolution.
+    """
+    if len(records) == 0:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+
+    timestamps = np.asarray(records['Timestamp'], dtype=np.int64)
+    local_starts = bucket_starts(timestamps, timeframe, session)
+
+    first = np.flatnonzero(np.r_[True, local_starts[1:] != local_starts[:-1]])
+    last = np.r_[first[1:] - 1, len(local_starts) - 1]
+
+    # Shift the local bar start back to UTC using the offset of the bar's first candle
+    utc_offset = _local_ms(timestamps[first], session.tz) - timestamps[first]
+
+    out = np.empty(len(first), dtype=CANDLE_DTYPE)
+    out['Timestamp'] = local_starts[first] - utc_offset
+    out['Open'] = records['Open'][first]
+    out['High'] = np.maximum.reduceat(np.asarray(records['High']), first)
+    out['Low'] = np.minimum.reduceat(np.asarray(records['Low']), first)
+    out['Close'] = records['Close'][last]
+    out['Volume'] = np.add.reduceat(np.asarray(records['Volume']), first)
+    return out
+
+
+def resample_ohlcv(df: pd.DataFrame, timeframe: str, session: str = "crypto") -> pd.DataFrame:
+    """
+    DataFrame wrapper around resample_records for standard OHLCV frames.
+
+    Args:
+        df (pd.DataFrame): Timestamp (ms), Open, High, Low, Close, Volume columns.
+        timeframe (str): Target resolution (e.g., '4h', '1d', '1wk').
+        session (str): Key of SESSIONS (e.g., 'crypto', 'america').
+
+    Returns:
+        pd.DataFrame: Resampled candles with a 'Datetime' column.
+    """
+    return records_to_frame(resample_records(frame_to_records(df), timeframe, SESSIONS[session]))
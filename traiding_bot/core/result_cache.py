@@ -0,0 +1,262 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+import numpy as np
+
+from core.metrics import CACHE_REQUESTS, inc
+from core.timeframes import timeframe_to_ms
+
+# Memory budget of the shared cache (estimated bytes of the cached values)
+DEFAULT_MAX_BYTES = int(os.environ.get("FIBOBOT_RESULT_CACHE_MB", 256)) * 1024 * 1024
+
+# A result lives for a fraction of its timeframe, within [MIN_TTL, MAX_TTL] seconds:
+# 1m -> 10s, 1h -> 2min, 4h -> 8min, 1d -> 48min, 1wk -> 1h
+TTL_FRACTION = 1 / 30
+MIN_TTL = 10.0
+MAX_TTL = 3600.0
+
+
+class ResultKey(NamedTuple):
+    """
+    Identifies one cached result, e.g. ResultKey('analysis', 'XRP/USDT', '1h', 500).
+    """
+    kind: str           # What was computed: 'candles', 'analysis', 'signals', 'prediction', ...
+    symbol: Hashable    # Symbol (or a tuple of symbols for watchlist-wide results)
+    timeframe: str
+    range: Hashable     # Period string or bar limit
+
+
+def ttl_for(timeframe: str) -> float:
+    """
+    Seconds a result on `timeframe` stays fresh: short for 1m data, longer for daily / weekly bars.
+    """
+    try:
+        seconds = timeframe_to_ms(timeframe) / 1000
+    except ValueError:
+        return MIN_TTL
+    return min(max(seconds * TTL_FRACTION, MIN_TTL), MAX_TTL)
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Approximates the memory held by a cached value.
+
+    Arrays and DataFrames report their buffers; tuples, lists and dicts are summed
+    recursively (a few levels deep); anything else falls back to sys.getsizeof.
+    """
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if hasattr(value, "memory_usage") and hasattr(value, "columns"):
+        return int(value.memory_usage(index=True).sum())   # DataFrame (object columns counted shallow)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    size = sys.getsizeof(value)
+    if _depth < 4:
+        if isinstance(value, dict):
+            size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            size += sum(estimate_size(item, _depth + 1) for item in value)
+    return size
+
+
+class _Entry(NamedTuple):
+    value: Any
+    size: int
+    expires: float
+
+
+class _Flight:
+    """
+    One in-progress computation; concurrent callers of the same key wait on it.
+    """
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResultCache:
+    """
+    Process-wide LRU cache of computed results, bounded by memory, with per-key TTLs
+    and single-flight request coalescing.
+
+    When several threads (e.g. Streamlit sessions) ask for the same missing key at once,
+    only the first one runs the computation; the others block until it finishes and get
+    the same result (or the same exception). Errors are never cached.
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, name: str = "results",
+                 sizeof: Callable[[Any], int] = estimate_size, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_bytes (int): Memory budget; least recently used entries are evicted beyond it.
+            name (str): Cache name used in the metrics.
+            sizeof (Callable): Size estimate of a value, in bytes.
+            clock (Callable): Monotonic time source in seconds.
+        """
+        self.max_bytes = max_bytes
+        self.name = name
+        self.sizeof = sizeof
+        self.clock = clock
+        self.nbytes = 0
+        self.hits = self.misses = self.coalesced = self.evictions = 0
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._lookup(key) is not None
+
+    # --- Lookup ---
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the fresh cached value for `key`, or `default`.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+        return default if entry is None else entry.value
+
+    def _lookup(self, key):
+        # Caller holds the lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= self.clock():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Returns the cached value for `key`, computing it (once across threads) if missing or expired.
+
+        Args:
+            key (Hashable): Cache key; a ResultKey's timeframe sets the default TTL.
+            compute (Callable): Zero-argument function producing the value.
+            ttl (float, optional): Seconds the value stays fresh (default: ttl_for(key.timeframe),
+                or MIN_TTL for other keys).
+
+        Returns:
+            The cached or freshly computed value.
+
+        Raises:
+            Exception: Whatever `compute` raised (for the caller and every coalesced waiter).
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                result = "hit"
+            else:
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._inflight[key] = _Flight()
+                    self.misses += 1
+                    result = "miss"
+                else:
+                    self.coalesced += 1
+                    result = "coalesced"
+        inc(CACHE_REQUESTS, cache=self.name, result=result)
+
+        if entry is not None:
+            return entry.value
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            if ttl is None:
+                ttl = ttl_for(key.timeframe) if isinstance(key, ResultKey) else MIN_TTL
+            self.set(key, flight.value, ttl)
+            return flight.value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    # --- Updates ---
+    def set(self, key: Hashable, value: Any, ttl: float):
+        """
+        Stores a value for `ttl` seconds, evicting least recently used entries beyond the budget.
+        Values larger than the whole budget are not stored.
+        """
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = _Entry(value, size, self.clock() + ttl)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.nbytes -= entry.size
+
+    def invalidate(self, predicate: Callable[[Hashable], bool] = None) -> int:
+        """
+        Drops every entry whose key matches `predicate` (all entries if omitted).
+
+        Returns:
+            int: Number of entries removed.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate is None or predicate(key)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: entries, bytes, max_bytes, hits, misses, coalesced, evictions and in-flight computations.
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.nbytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced,
+                    "evictions": self.evictions, "inflight": len(self._inflight)}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """
+    Returns the process-wide ResultCache instance (created on first use).
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
@@ -0,0 +1,221 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from core.candle_cache import CANDLE_DTYPE, OHLCV_COLUMNS
+
+VALUE_COLUMNS = OHLCV_COLUMNS[1:]   # Open, High, Low, Close, Volume
+_COLUMN_ROW = {name: row for row, name in enumerate(VALUE_COLUMNS)}
+
+# Extra rows allocated behind the window, as a fraction of the capacity. Appends fill the
+# slack and only then shift the window back to the front (one memmove per `slack` appends),
+# so the live window is always one contiguous slice.
+DEFAULT_SLACK = 0.25
+
+
+def bytes_per_series(capacity: int, slack: float = DEFAULT_SLACK) -> int:
+    """
+    Memory of one CandleRing: int64 timestamps + 5 float32 values per allocated row.
+    """
+    rows = capacity + max(1, int(capacity * slack))
+    return rows * (8 + 4 * len(VALUE_COLUMNS))
+
+
+class CandleRing:
+    """
+    Fixed-capacity candle window of one (symbol, timeframe) in contiguous arrays.
+
+    Timestamps are int64 (epoch ms) and Open/High/Low/Close/Volume float32 stored
+    column-major, so every column of the window is a contiguous zero-copy NumPy view.
+    float32 keeps ~7 significant digits, ample for signal, level and ML math.
+
+    Views returned by `timestamps`, `column()` and `ring['Close']` stay valid until the
+    next append that compacts the buffer; copy them to keep them longer.
+    """
+
+    def __init__(self, capacity: int, slack: float = DEFAULT_SLACK):
+        self.capacity = capacity
+        rows = capacity + max(1, int(capacity * slack))
+        self._timestamps = np.zeros(rows, dtype=np.int64)
+        self._values = np.zeros((len(VALUE_COLUMNS), rows), dtype=np.float32)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def nbytes(self) -> int:
+        return self._timestamps.nbytes + self._values.nbytes
+
+    def _make_room(self, count: int):
+        # Shift the newest rows back to the front once the slack is used up
+        if self._end + count <= len(self._timestamps):
+            return
+        keep = min(len(self), self.capacity - count)
+        src = slice(self._end - keep, self._end)
+        self._timestamps[:keep] = self._timestamps[src]
+        self._values[:, :keep] = self._values[:, src]
+        self._start, self._end = 0, keep
+
+    # --- Writes ---
+
+    def append(self, timestamp: int, open_: float, high: float, low: float, close: float, volume: float) -> bool:
+        """
+        Adds a candle. A candle with the same timestamp as the newest one replaces it
+        (bar in progress); older candles are ignored.
+
+        Returns:
+            bool: True if the candle was stored.
+        """
+        if self._end > self._start:
+            last = self._timestamps[self._end - 1]
+            if timestamp < last:
+                return False
+            if timestamp == last:
+                self._values[:, self._end - 1] = (open_, high, low, close, volume)
+                return True
+
+        self._make_room(1)
+        self._timestamps[self._end] = timestamp
+        self._values[:, self._end] = (open_, high, low, close, volume)
+        self._end += 1
+        if len(self) > self.capacity:
+            self._start += 1
+        return True
+
+    def extend(self, records: np.ndarray):
+        """
+        Appends CANDLE_DTYPE records (sorted by timestamp) in one vectorized copy.
+
+        Records overlapping the stored window replace the matching bars from there on.
+        """
+        if len(records) == 0:
+            return
+        timestamps = np.asarray(records['Timestamp'], dtype=np.int64)
+        if self._end > self._start:
+            # Drop stored bars at or after the first new timestamp; the new records win
+            cut = int(np.searchsorted(self._timestamps[self._start:self._end], timestamps[0]))
+            self._end = self._start + cut
+
+        records = records[-self.capacity:]
+        timestamps = timestamps[-self.capacity:]
+        count = len(records)
+        self._make_room(count)
+
+        dest = slice(self._end, self._end + count)
+        self._timestamps[dest] = timestamps
+        for row, name in enumerate(VALUE_COLUMNS):
+            self._values[row, dest] = records[name]
+        self._end += count
+        self._start = max(self._start, self._end - self.capacity)
+
+    # --- Zero-Copy Reads ---
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[self._start:self._end]
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        float32 view of one of Open, High, Low, Close, Volume.
+        """
+        return self._values[_COLUMN_ROW[name], self._start:self._end]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name == 'Timestamp':
+            return self.timestamps
+        return self.column(name)
+
+    @property
+    def values(self) -> np.ndarray:
+        """
+        View of shape (5, len(self)): rows Open, High, Low, Close, Volume.
+        """
+        return self._values[:, self._start:self._end]
+
+    def last(self) -> Optional[tuple]:
+        if self._end == self._start:
+            return None
+        i = self._end - 1
+        return (int(self._timestamps[i]), *self._values[:, i].tolist())
+
+    # --- Copies (boundaries) ---
+
+    def records(self) -> np.ndarray:
+        out = np.empty(len(self), dtype=CANDLE_DTYPE)
+        out['Timestamp'] = self.timestamps
+        for name in VALUE_COLUMNS:
+            out[name] = self.column(name)
+        return out
+
+    def to_frame(self):
+        """
+        Standard OHLCV DataFrame with a 'Datetime' column, for plotting.
+        """
+        from core.candle_cache import records_to_frame
+
+        return records_to_frame(self.records())
+
+
+class RingStore:
+    """
+    In-memory candle windows for many (symbol, timeframe) series with predictable memory:
+    every series costs exactly `bytes_per_series(capacity, slack)` bytes.
+
+    At the default capacity of 1,440 bars (one day of 1m candles), 5,000 symbols need ~250 MB.
+    """
+
+    def __init__(self, capacity: int = 1440, slack: float = DEFAULT_SLACK):
+        self.capacity = capacity
+        self.slack = slack
+        self.rings: Dict[Tuple[str, str], CandleRing] = {}
+        self._lock = threading.Lock()
+
+    def ring(self, symbol: str, timeframe: str) -> CandleRing:
+        """
+        Returns the series' ring, allocating it on first use.
+        """
+        key = (symbol, timeframe)
+        ring = self.rings.get(key)
+        if ring is None:
+            with self._lock:
+                ring = self.rings.get(key)
+                if ring is None:
+                    ring = self.rings[key] = CandleRing(self.capacity, self.slack)
+        return ring
+
+    def get(self, symbol: str, timeframe: str) -> Optional[CandleRing]:
+        return self.rings.get((symbol, timeframe))
+
+    def append(self, symbol: str, timeframe: str, candle) -> bool:
+        """
+        Args:
+            candle (tuple): (timestamp, open, high, low, close, volume), e.g. a core.streaming.Candle.
+        """
+        return self.ring(symbol, timeframe).append(*candle)
+
+    def extend(self, symbol: str, timeframe: str, records: np.ndarray):
+        self.ring(symbol, timeframe).extend(records)
+
+    def load(self, source: str, symbol: str, timeframe: str, cache=None) -> CandleRing:
+        """
+        Fills a series from the latest stored candles of the on-disk candle cache.
+        """
+        from core.candle_cache import get_default_cache
+
+        records = (cache or get_default_cache()).read(source, symbol, timeframe)
+        ring = self.ring(symbol, timeframe)
+        ring.extend(records[-self.capacity:])
+        return ring
+
+    @property
+    def nbytes(self) -> int:
+        return sum(ring.nbytes for ring in self.rings.values())
+
+    def __len__(self):
+        return len(self.rings)
+
+    def __contains__(self, key):
+        return key in self.rings
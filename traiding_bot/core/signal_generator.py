@@ -1,70 +1,318 @@
-from tradingview_ta import TA_Handler
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
 from core.fibonacci_utils import calculate_fibonacci_levels
+from core.level_index import match_levels
+from core.metrics import PROVIDER_BYTES, PROVIDER_REQUESTS, PROVIDER_ROWS, inc, is_enabled, timed
+from core.pivots import DEFAULT_THRESHOLD, swing_levels
+from core.rate_limit import RateLimiter
+
+# Default proximity band around a level: 0.3% of the current price
+DEFAULT_TOLERANCE_RATIO = 0.003
+
+# --- Analysis Providers ---
+
+class TradingViewProvider:
+    """
+    Fetches TradingView indicators in batches via the multi-symbol scan endpoint.
+
+    All worker threads share this provider's rate limiter, so the scan never exceeds
+    `requests_per_second` requests against TradingView.
+    """
+
+    name = "tradingview"
+
+    def __init__(self, requests_per_second: float = 5.0, max_batch_size: int = 100, timeout: float = 10.0):
+        self.rate_limiter = RateLimiter(requests_per_second, burst=int(max(1, requests_per_second)))
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
 
-def get_price_range(symbol: str, exchange: str, screener: str = "crypto") -> tuple:
+    def fetch_indicators(self, screener: str, interval: str, tickers: List[str]) -> Dict[str, Optional[dict]]:
+        """
+        Args:
+            screener (str): Market screener (e.g., 'crypto', 'america').
+            interval (str): Candle interval (e.g., '1h', '1m').
+            tickers (list): 'EXCHANGE:SYMBOL' strings, all from the same screener.
+
+        Returns:
+            dict: 'EXCHANGE:SYMBOL' (upper-case) -> indicators dict, or None if not found.
+        """
+        from tradingview_ta import get_multiple_analysis
+
+        self.rate_limiter.acquire()
+        inc(PROVIDER_REQUESTS, provider=self.name)
+        with timed("provider_fetch", provider=self.name):
+            analyses = get_multiple_analysis(screener=screener, interval=interval, symbols=tickers, timeout=self.timeout)
+        indicators = {ticker: (analysis.indicators if analysis is not None else None)
+                      for ticker, analysis in analyses.items()}
+
+        if is_enabled():
+            # The scan endpoint returns JSON; its re-encoded size approximates the payload
+            inc(PROVIDER_ROWS, sum(1 for values in indicators.values() if values), provider=self.name)
+            inc(PROVIDER_BYTES, len(json.dumps(indicators, default=str)), provider=self.name)
+        return indicators
+
+
+class StaticProvider:
     """
-    Fetches the High and Low prices for a given symbol over a specified timeframe.
-    Currently uses '1h' interval to determine Swing High/Low points.
+    In-memory provider serving fixed indicators; stands in for TradingView in tests and offline runs.
+    """
+
+    name = "static"
+
+    def __init__(self, indicators: Dict[Tuple[str, str], dict], max_batch_size: int = 100):
+        """
+        Args:
+            indicators (dict): ('EXCHANGE:SYMBOL', interval) -> indicators dict
+                (e.g., {'high': ..., 'low': ..., 'close': ...}).
+        """
+        self.indicators = {(ticker.upper(), interval): values for (ticker, interval), values in indicators.items()}
+        self.max_batch_size = max_batch_size
+
+    def fetch_indicators(self, screener: str, interval: str, tickers: List[str]) -> Dict[str, Optional[dict]]:
+        return {ticker.upper(): self.indicators.get((ticker.upper(), interval)) for ticker in tickers}
+
+
+class CandleProvider:
+    """
+    Derives the indicators from locally cached candles instead of TradingView.
+
+    The '1h' high/low are the end points of the latest confirmed ZigZag swing leg
+    (see core.pivots) rather than the range of the current bar. The leg's direction-aware
+    levels are passed along under 'levels' and those of the `legs - 1` earlier legs under
+    'older_levels'. The same answer carries the latest close, so a scan loads and walks
+    each ticker's candles once instead of once per interval.
+    """
+
+    name = "candles"
+    intervals = ("1h",)   # The '1h' answer includes the close, so scan_watchlist sends no '1m' job
+
+    def __init__(self, timeframe: str = "1h", limit: int = 500, threshold: float = DEFAULT_THRESHOLD,
+                 legs: int = 3, max_batch_size: int = 1):
+        """
+        Args:
+            max_batch_size (int): Tickers per job; the default of one loads tickers in parallel
+                and keeps a failing ticker from failing the rest of its batch.
+        """
+        self.timeframe = timeframe
+        self.limit = limit
+        self.threshold = threshold
+        self.legs = legs
+        self.max_batch_size = max_batch_size
+
+    def _indicators(self, screener: str, ticker: str) -> Optional[dict]:
+        # Data layer imported on first use so the signal logic stays free of pandas
+        from core.data_sources import load_candles, resolve_source
+
+        source, market_symbol = resolve_source(ticker.split(":", 1)[-1], screener)
+        df = load_candles(source, market_symbol, self.timeframe, limit=self.limit)
+        df = df.dropna(subset=["High", "Low", "Close"])
+        if df.empty:
+            return None
+
+        grids = swing_levels(df["High"].to_numpy(), df["Low"].to_numpy(), count=self.legs, threshold=self.threshold)
+        levels = grids[0]
+        return {"high": max(levels.values()), "low": min(levels.values()),
+                "close": float(df["Close"].iloc[-1]), "levels": levels, "older_levels": grids[1:]}
+
+    def fetch_indicators(self, screener: str, interval: str, tickers: List[str]) -> Dict[str, Optional[dict]]:
+        """
+        Every answer is built from `self.timeframe` candles, whatever the `interval`.
+        Loading errors propagate so scan_watchlist records them against the batch.
+        """
+        return {ticker.upper(): self._indicators(screener, ticker) for ticker in tickers}
+
+
+_default_provider = None
+
+def get_default_provider() -> CandleProvider:
+    """
+    Returns the shared candle provider, so signals are measured on the latest confirmed
+    swing leg rather than the current 1h bar's high/low. Pass a TradingViewProvider to
+    scan_watchlist for the TradingView indicators instead.
+    """
+    global _default_provider
+    if _default_provider is None:
+        _default_provider = CandleProvider()
+    return _default_provider
+
+
+# --- Signal Evaluation ---
+
+@dataclass
+class FibonacciSignal:
+    """
+    Structured result of a Fibonacci proximity check for one symbol.
+    """
+    symbol: str
+    exchange: str
+    screener: str
+    high: Optional[float] = None
+    low: Optional[float] = None
+    close: Optional[float] = None
+    levels: Dict[str, float] = field(default_factory=dict)
+    level_label: Optional[str] = None   # Closest level within the tolerance band, if any
+    level_price: Optional[float] = None
+    error: Optional[str] = None
+    matches: List[tuple] = field(default_factory=list)   # (label, price, grid) of every level in the band
+
+    @property
+    def near_level(self) -> bool:
+        return self.level_label is not None
+
+    @property
+    def confluence(self) -> int:
+        """Number of levels (across all grids) inside the tolerance band."""
+        return len(self.matches)
+
+    def to_message(self) -> str:
+        """
+        Formats the result as the human-readable message shown in the dashboard.
+        """
+        if self.error == "range":
+            return "⚠️ Error: Could not retrieve price data."
+        if self.error:
+            return f"⚠️ Error analyzing signal: {self.error}"
+        if self.near_level:
+            message = (f"⚠️ Close to Fibonacci level {self.level_label} at {self.level_price:.4f} "
+                       f"(Current: {self.close:.4f})")
+            if self.confluence > 1:
+                message += f" | 🔗 Confluence of {self.confluence} levels"
+            return message
+        return f"✅ No significant Fibonacci level nearby. (Current: {self.close:.4f})"
+
+
+def evaluate_fibonacci_signal(symbol: str, exchange: str, screener: str, high: float, low: float,
+                              close: float, tolerance_ratio: float = DEFAULT_TOLERANCE_RATIO,
+                              levels: Optional[Dict[str, float]] = None,
+                              older_levels: Optional[List[Dict[str, float]]] = None) -> FibonacciSignal:
+    """
+    Checks whether `close` lies within the tolerance band of a Fibonacci level of the (high, low) range.
+
+    Args:
+        high (float): Swing high used to build the levels.
+        low (float): Swing low used to build the levels.
+        close (float): Current price.
+        tolerance_ratio (float): Band half-width as a fraction of the current price.
+        levels (dict, optional): Precomputed levels (e.g. a direction-aware swing-leg grid
+            from core.pivots); by default they are measured down from `high`.
+        older_levels (list, optional): Grids of other swings / timeframes; their levels
+            count towards the match list and confluence but not `levels`.
+
+    Returns:
+        FibonacciSignal: The structured result.
+    """
+    signal = FibonacciSignal(symbol=symbol, exchange=exchange, screener=screener, high=high, low=low, close=close)
+    signal.levels = dict(levels) if levels is not None else calculate_fibonacci_levels(high, low)
+
+    # Every level of every grid inside the band, via a sorted level index (closest first)
+    signal.matches = match_levels([signal.levels] + list(older_levels or []), close, tolerance_ratio * close)
+    if signal.matches:
+        signal.level_label, signal.level_price = signal.matches[0][0], signal.matches[0][1]
+    return signal
+
+
+@timed("scan_watchlist")
+def scan_watchlist(watchlist: Iterable[Tuple[str, str, str]], provider=None, max_workers: int = 8,
+                   tolerance_ratio: float = DEFAULT_TOLERANCE_RATIO) -> List[FibonacciSignal]:
+    """
+    Generates Fibonacci signals for a whole watchlist concurrently.
+
+    Symbols are grouped by screener and fetched in batches (one request per batch and
+    interval) on a bounded thread pool. Both the '1h' range and the '1m' close requests
+    run in parallel instead of two sequential round-trips per symbol; providers whose
+    `intervals` omit '1m' (e.g. CandleProvider) get one request per batch and their
+    '1h' answer supplies the close.
 
     Args:
-        symbol (str): Ticker symbol (e.g., 'BTCUSDT').
-        exchange (str): Exchange name (e.g., 'BINANCE').
-        screener (str): Market screener (default: 'crypto').
+        watchlist (iterable): (symbol, exchange, screener) tuples.
+        provider: Object with `max_batch_size` and `fetch_indicators(screener, interval, tickers)`;
+            defaults to the shared CandleProvider.
+        max_workers (int): Maximum number of concurrent requests.
+        tolerance_ratio (float): Proximity band as a fraction of the current price.
 
     Returns:
-        tuple: (high, low) as floats, or (None, None) if an error occurs.
-    """
-    try:
-        handler = TA_Handler(
-            symbol=symbol,
-            screener=screener,
-            exchange=exchange,
-            interval="1h"  # Using 1-hour candles to identify significant levels
-        )
-        analysis = handler.get_analysis()
-        return analysis.indicators['high'], analysis.indicators['low']
-    except Exception as e:
-        print(f"❌ Error fetching price range for {symbol}: {e}")
-        return None, None
-
-def generate_fibonacci_signal(symbol: str, exchange: str, screener: str = "crypto") -> str:
+        list: One FibonacciSignal per watchlist entry, in input order.
+    """
+    provider = provider or get_default_provider()
+    intervals = getattr(provider, "intervals", ("1h", "1m"))
+    close_interval = "1m" if "1m" in intervals else "1h"
+    watchlist = list(watchlist)
+
+    # 1. Group tickers by screener and split them into provider-sized batches
+    by_screener: Dict[str, List[str]] = {}
+    for symbol, exchange, screener in watchlist:
+        tickers = by_screener.setdefault(screener, [])
+        ticker = f"{exchange}:{symbol}".upper()
+        if ticker not in tickers:
+            tickers.append(ticker)
+
+    jobs = []
+    for screener, tickers in by_screener.items():
+        for i in range(0, len(tickers), provider.max_batch_size):
+            batch = tickers[i:i + provider.max_batch_size]
+            jobs.append((screener, "1h", batch))       # Macro view: swing high/low
+            if "1m" in intervals:
+                jobs.append((screener, "1m", batch))   # Micro view: current close
+
+    # 2. Fetch every batch concurrently
+    results: Dict[Tuple[str, str, str], Optional[dict]] = {}
+    errors: Dict[Tuple[str, str, str], str] = {}
+
+    def run(job):
+        screener, interval, batch = job
+        try:
+            return job, provider.fetch_indicators(screener, interval, batch), None
+        except Exception as e:
+            return job, {}, str(e)
+
+    if jobs:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as pool:
+            for (screener, interval, batch), indicators, error in pool.map(run, jobs):
+                for ticker in batch:
+                    results[(screener, interval, ticker)] = indicators.get(ticker)
+                    if error:
+                        errors[(screener, interval, ticker)] = error
+
+    # 3. Evaluate each symbol from the fetched indicators
+    signals = []
+    for symbol, exchange, screener in watchlist:
+        ticker = f"{exchange}:{symbol}".upper()
+        macro = results.get((screener, "1h", ticker))
+        micro = results.get((screener, close_interval, ticker))
+
+        high = macro.get('high') if macro else None
+        low = macro.get('low') if macro else None
+        if high is None or low is None:
+            signals.append(FibonacciSignal(symbol=symbol, exchange=exchange, screener=screener,
+                                           error=errors.get((screener, "1h", ticker), "range")))
+            continue
+
+        close = micro.get('close') if micro else None
+        if close is None:
+            error = errors.get((screener, close_interval, ticker), f"No {close_interval} data for {ticker}")
+            signals.append(FibonacciSignal(symbol=symbol, exchange=exchange, screener=screener,
+                                           high=high, low=low, error=error))
+            continue
+
+        signals.append(evaluate_fibonacci_signal(symbol, exchange, screener, high, low, close, tolerance_ratio,
+                                                 levels=macro.get('levels'), older_levels=macro.get('older_levels')))
+
+    return signals
+
+
+def generate_fibonacci_signal(symbol: str, exchange: str, screener: str = "crypto", provider=None) -> str:
     """
     Analyzes the current price position relative to calculated Fibonacci levels.
 
     It performs a Multi-Timeframe Analysis:
     1. Calculates levels based on '1h' timeframe (Macro view).
     2. Compares current price from '1m' timeframe (Micro view).
-    
+
     Returns:
         str: A formatted message indicating if the price is near a key level.
     """
-    # 1. Get Macro Levels (Swing High/Low)
-    high, low = get_price_range(symbol, exchange, screener)
-    
-    if high is None or low is None:
-        return "⚠️ Error: Could not retrieve price data."
-
-    levels = calculate_fibonacci_levels(high, low)
-
-    try:
-        # 2. Get Current Micro Price (Real-time execution price)
-        current_price = TA_Handler(
-            symbol=symbol,
-            screener=screener,
-            exchange=exchange,
-            interval="1m"
-        ).get_analysis().indicators['close']
-
-        # 3. Check for Proximity (Signal Logic)
-        # We define a 'tolerance' threshold of 0.3% (0.003) around the level
-        # to account for market noise.
-        tolerance_ratio = 0.003 
-
-        for label, level in levels.items():
-            if abs(current_price - level) < (tolerance_ratio * current_price):
-                return f"⚠️ Close to Fibonacci level {label} at {level:.4f} (Current: {current_price:.4f})"
-        
-        return f"✅ No significant Fibonacci level nearby. (Current: {current_price:.4f})"
-
-    except Exception as e:
-        return f"⚠️ Error analyzing signal: {str(e)}"
\ No newline at end of file
+    # A tolerance of 0.3% around each level accounts for market noise (see DEFAULT_TOLERANCE_RATIO)
+    return scan_watchlist([(symbol, exchange, screener)], provider=provider)[0].to_message()
@@ -1,16 +1,32 @@
-import yfinance as yf
+from typing import Dict, List, NamedTuple, Optional
+
 import pandas as pd
-import plotly.graph_objects as go
-import streamlit as st
-from core.fibonacci_utils import calculate_fibonacci_levels
+from core.data_sources import DataFetchError, load_candles
+from core.metrics import timed
+from core.pivots import DEFAULT_THRESHOLD, swing_levels
+
+
+class StockAnalysis(NamedTuple):
+    """
+    Candles and Fibonacci levels of a stock; `warning` is set when there is nothing to plot.
+
+    `levels` is the grid of the latest swing leg and `older_levels` those of the legs before it.
+    """
+    data: pd.DataFrame
+    levels: Dict[str, float]
+    warning: Optional[str] = None
+    older_levels: List[Dict[str, float]] = []
+
 
 class StockPlotter:
     """
     Handles fetching and visualization of Stock Market data (e.g., NASDAQ, NYSE).
     Uses 'yfinance' API to retrieve historical data and overlays Fibonacci levels.
+
+    Only plot() depends on Streamlit; fetch_data() and analyze() can run in any process.
     """
 
-    def __init__(self, symbol='NANO', period='1mo', interval='1h'):
+    def __init__(self, symbol='NANO', period='1mo', interval='1h', threshold=DEFAULT_THRESHOLD, legs=3):
         """
         Initializes the StockPlotter.
 
@@ -18,76 +34,70 @@ class StockPlotter:
             symbol (str): The stock ticker symbol (e.g., 'AAPL', 'QQQ').
             period (str): The historical period to download (e.g., '1mo', '1y').
             interval (str): The data resolution (e.g., '1h', '1d').
+            threshold (float): ZigZag reversal that confirms a swing pivot (fraction of price).
+            legs (int): Number of recent swing legs whose grids are drawn.
         """
         self.symbol = symbol
         self.period = period
         self.interval = interval
+        self.threshold = threshold
+        self.legs = legs
 
     def fetch_data(self) -> pd.DataFrame:
         """
-        Fetches historical market data using Yahoo Finance API.
-        
+        Fetches historical market data using Yahoo Finance API through the local candle cache.
+        Only candles newer than the last stored one are downloaded, and daily/weekly
+        bars are resampled from the stored 1h series when possible.
+
         Returns:
             pd.DataFrame: A DataFrame containing OHLC data with a standardized 'Datetime' column.
+
+        Raises:
+            DataFetchError: If the candles could not be retrieved.
         """
         try:
-            ticker = yf.Ticker(self.symbol)
-            df = ticker.history(period=self.period, interval=self.interval)
-            
-            # Reset index to make 'Date'/'Datetime' a column instead of index
-            df.reset_index(inplace=True)
-
-            # 🛠️ Fix: Standardize Date Column Name
-            # yfinance returns 'Date' for daily data and 'Datetime' for intraday.
-            # We rename it to 'Datetime' for consistency across the app.
-            if 'Date' in df.columns:
-                df.rename(columns={'Date': 'Datetime'}, inplace=True)
-            
-            return df
+            return load_candles('yfinance', self.symbol, self.interval, period=self.period)
         except Exception as e:
-            st.error(f"❌ Error fetching data for {self.symbol}: {e}")
-            return pd.DataFrame()
+            raise DataFetchError(f"❌ Error fetching data for {self.symbol}: {e}") from e
 
-    def plot(self):
+    @timed("analyze", plotter="stock")
+    def analyze(self, data: Optional[pd.DataFrame] = None) -> StockAnalysis:
         """
-        Renders an interactive Candlestick chart in Streamlit with Fibonacci overlays.
+        Validates the candles and calculates the Fibonacci levels.
+
+        Args:
+            data (pd.DataFrame, optional): Candles to analyze; fetched when omitted.
+
+        Returns:
+            StockAnalysis: Candles and levels (or a warning).
         """
-        data = self.fetch_data()
+        if data is None:
+            data = self.fetch_data()
 
         # 1. Validation: Check if data exists
         if data.empty:
-            st.warning(f"⚠️ No data found for symbol: {self.symbol}")
-            return
+            return StockAnalysis(data, {}, f"⚠️ No data found for symbol: {self.symbol}")
 
         # 2. Validation: Check for required columns
         if 'Datetime' not in data.columns:
-            st.error("⚠️ Data Error: Missing 'Datetime' column.")
-            return
+            return StockAnalysis(pd.DataFrame(), {}, "⚠️ Data Error: Missing 'Datetime' column.")
 
         # --- Fibonacci Calculation ---
-        high = data['High'].max()
-        low = data['Low'].min()
-        levels = calculate_fibonacci_levels(high, low)
-
-        # --- Chart Construction ---
-        fig = go.Figure(data=[go.Candlestick(
-            x=data['Datetime'],
-            open=data['Open'],
-            high=data['High'],
-            low=data['Low'],
-            close=data['Close'],
-            name=self.symbol
-        )])
-
-        # Draw Fibonacci Lines
-        for label, level in levels.items():
-            fig.add_hline(
-                y=float(level), 
-                line_dash="dash", 
-                annotation_text=label, 
-                line_color="blue",
-                annotation_position="top right"
-            )
+        # One grid per recent ZigZag swing leg (whole-window range until a leg is confirmed)
+        grids = swing_levels(data['High'].to_numpy(), data['Low'].to_numpy(), count=self.legs, threshold=self.threshold)
+        return StockAnalysis(data, grids[0], older_levels=grids[1:])
+
+    def build_figure(self, analysis: StockAnalysis):
+        """
+        Builds the Plotly chart for an analysis (Plotly is imported on first use).
+
+        Returns:
+            go.Figure: Candles downsampled to the chart width; all levels are drawn as one trace.
+        """
+        from core.chart_rendering import build_fibonacci_figure
+
+        fig = build_fibonacci_figure(analysis.data, analysis.levels, name=self.symbol,
+                                     older_levels=analysis.older_levels)
 
         # Update layout for better visibility
         fig.update_layout(
@@ -96,5 +106,31 @@ class StockPlotter:
             yaxis_title="Price",
             height=500
         )
+        return fig
+
+    def plot(self, analysis: Optional[StockAnalysis] = None):
+        """
+        Renders an interactive Candlestick chart in Streamlit with Fibonacci overlays.
+
+        Args:
+            analysis (StockAnalysis, optional): Precomputed (e.g. cached) analysis;
+                fetched and computed when omitted.
+
+        Returns:
+            pd.DataFrame: The candles that were plotted (empty if nothing could be fetched).
+        """
+        import streamlit as st
+
+        if analysis is None:
+            try:
+                analysis = self.analyze()
+            except DataFetchError as e:
+                st.error(str(e))
+                return pd.DataFrame()
+
+        if analysis.warning:
+            st.warning(analysis.warning)
+            return analysis.data
 
-        st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+        st.plotly_chart(self.build_figure(analysis), use_container_width=True)
+        return analysis.data
@@ -0,0 +1,217 @@
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from core.candle_cache import CandleCache, get_default_cache
+from core.crossings import DOWN, UP
+from core.fibonacci_utils import FIB_LABELS, FIB_RATIOS
+
+# Event kinds emitted by the streaming engine
+CROSS = "cross"          # Close crossed a level between the previous and the current candle
+PROXIMITY = "proximity"  # Close entered the tolerance band around a level
+
+
+class Candle(NamedTuple):
+    timestamp: int   # Candle open time, epoch milliseconds
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+class SignalEvent(NamedTuple):
+    symbol: str
+    timestamp: int
+    kind: str              # CROSS or PROXIMITY
+    level_label: str
+    level_price: float
+    direction: int         # UP / DOWN for crossings, 0 for proximity
+    close: float
+
+
+class RollingExtremum:
+    """
+    Sliding-window maximum (or minimum) in amortized O(1) per update.
+
+    Keeps a monotonic deque of (bar_index, value); every value is pushed and popped
+    at most once, and the deque never holds more than `window` entries.
+    """
+
+    def __init__(self, window: int, mode: str = "max"):
+        if mode not in ("max", "min"):
+            raise ValueError("mode must be 'max' or 'min'")
+        self.window = window
+        self._is_max = mode == "max"
+        self._items = deque()
+
+    def push(self, index: int, value: float) -> float:
+        """
+        Adds the value observed at bar `index` and returns the current window extremum.
+        """
+        items = self._items
+        if self._is_max:
+            while items and items[-1][1] <= value:
+                items.pop()
+        else:
+            while items and items[-1][1] >= value:
+                items.pop()
+        items.append((index, value))
+
+        # Evict values that slid out of the window
+        while items[0][0] <= index - self.window:
+            items.popleft()
+        return items[0][1]
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._items[0][1] if self._items else None
+
+
+class StreamingFibonacciEngine:
+    """
+    Incremental Fibonacci signal engine for a single symbol.
+
+    Each candle updates the rolling swing high/low, rebuilds the (constant-size) level grid
+    and emits crossing and proximity events for that candle only; past bars are never rescanned.
+    Memory is bounded by the swing window.
+    """
+
+    def __init__(self, symbol: str, window: int = 100, tolerance_ratio: float = 0.003,
+                 min_periods: int = None, ratios=FIB_RATIOS, labels=FIB_LABELS):
+        """
+        Args:
+            symbol (str): Symbol attached to emitted events.
+            window (int): Swing window length in candles (including the current one).
+            tolerance_ratio (float): Proximity band as a fraction of the close price.
+            min_periods (int): Candles required before events are emitted (default: window).
+            ratios (array-like): Retracement ratios of the grid.
+            labels (sequence): Labels matching `ratios`.
+        """
+        self.symbol = symbol
+        self.tolerance_ratio = tolerance_ratio
+        self.min_periods = window if min_periods is None else min_periods
+        self.ratios = tuple(float(r) for r in ratios)
+        self.labels = tuple(labels)
+
+        self._highs = RollingExtremum(window, "max")
+        self._lows = RollingExtremum(window, "min")
+        self._count = 0
+        self._last_timestamp = None
+        self._prev_close = None
+        self._near = [False] * len(self.ratios)
+        self.levels: List[float] = []
+
+    def _grid(self, high: float, low: float) -> List[float]:
+        diff = high - low
+        levels = [high - r * diff for r in self.ratios]
+        # Pin the end points exactly, like fibonacci_level_grid
+        for j, r in enumerate(self.ratios):
+            if r == 0.0:
+                levels[j] = high
+            elif r == 1.0:
+                levels[j] = low
+        return levels
+
+    def update(self, candle: Candle) -> List[SignalEvent]:
+        """
+        Consumes one closed candle and returns the events it triggers.
+
+        Candles that are not newer than the last one seen are ignored.
+        """
+        if self._last_timestamp is not None and candle.timestamp <= self._last_timestamp:
+            return []
+        self._last_timestamp = candle.timestamp
+
+        index = self._count
+        self._count += 1
+        high = self._highs.push(index, candle.high)
+        low = self._lows.push(index, candle.low)
+        self.levels = self._grid(high, low)
+
+        prev_close, close = self._prev_close, candle.close
+        self._prev_close = close
+        if self._count < self.min_periods:
+            return []
+
+        events = []
+        band = self.tolerance_ratio * close
+        for j, level in enumerate(self.levels):
+            # Crossing through the level since the previous candle
+            if prev_close is not None:
+                if prev_close < level < close:
+                    events.append(SignalEvent(self.symbol, candle.timestamp, CROSS, self.labels[j], level, UP, close))
+                elif prev_close > level > close:
+                    events.append(SignalEvent(self.symbol, candle.timestamp, CROSS, self.labels[j], level, DOWN, close))
+
+            # Proximity is edge-triggered: report only when the close enters the band
+            near = abs(close - level) < band
+            if near and not self._near[j]:
+                events.append(SignalEvent(self.symbol, candle.timestamp, PROXIMITY, self.labels[j], level, 0, close))
+            self._near[j] = near
+
+        return events
+
+    def run(self, candles: Iterable[Candle]) -> Iterator[SignalEvent]:
+        """
+        Drives the engine from any candle iterator (live feed, file replay, ...).
+        """
+        for candle in candles:
+            yield from self.update(candle)
+
+
+class MultiSymbolMonitor:
+    """
+    Routes candles of many symbols to one StreamingFibonacciEngine each, inside a single process.
+    """
+
+    def __init__(self, **engine_kwargs):
+        """
+        Args:
+            **engine_kwargs: Passed to every StreamingFibonacciEngine (window, tolerance_ratio, ...).
+        """
+        self.engine_kwargs = engine_kwargs
+        self.engines: Dict[str, StreamingFibonacciEngine] = {}
+
+    def update(self, symbol: str, candle: Candle) -> List[SignalEvent]:
+        engine = self.engines.get(symbol)
+        if engine is None:
+            engine = self.engines[symbol] = StreamingFibonacciEngine(symbol, **self.engine_kwargs)
+        return engine.update(candle)
+
+    def run(self, stream: Iterable[Tuple[str, Candle]]) -> Iterator[SignalEvent]:
+        for symbol, candle in stream:
+            yield from self.update(symbol, candle)
+
+
+# --- Candle Sources ---
+
+def iter_frame_candles(df) -> Iterator[Candle]:
+    """
+    Yields candles from a standard OHLCV DataFrame (Timestamp, Open, High, Low, Close, Volume).
+    """
+    columns = [df[col].to_numpy() for col in ('Timestamp', 'Open', 'High', 'Low', 'Close', 'Volume')]
+    for ts, o, h, l, c, v in zip(*columns):
+        yield Candle(int(ts), float(o), float(h), float(l), float(c), float(v))
+
+
+def replay_candles(source: str, symbol: str, timeframe: str, cache: Optional[CandleCache] = None,
+                   start: Optional[int] = None, chunk_size: int = 4096) -> Iterator[Candle]:
+    """
+    Replays a stored series from the candle cache, reading the memory-mapped file in chunks.
+
+    Args:
+        source (str): Data provider name used by the cache (e.g., 'binance').
+        symbol (str): Ticker or trading pair.
+        timeframe (str): Candle resolution.
+        cache (CandleCache, optional): Store to read (defaults to the shared one).
+        start (int, optional): First timestamp (ms) to replay.
+        chunk_size (int): Records materialized at a time.
+    """
+    cache = cache or get_default_cache()
+    records = cache.read(source, symbol, timeframe)
+    first = 0 if start is None else int(records['Timestamp'].searchsorted(start))
+
+    for offset in range(first, len(records), chunk_size):
+        chunk = records[offset:offset + chunk_size].tolist()
+        for ts, o, h, l, c, v in chunk:
+            yield Candle(int(ts), o, h, l, c, v)
@@ -0,0 +1,26 @@
+import re
+
+# Duration of one unit for timeframe / period suffixes (ccxt and yfinance notation)
+_UNIT_MS = {
+    'm': 60_000,
+    'h': 3_600_000,
+    'd': 86_400_000,
+    'wk': 7 * 86_400_000,
+    'w': 7 * 86_400_000,
+    'mo': 30 * 86_400_000,
+    'M': 30 * 86_400_000,
+    'y': 365 * 86_400_000,
+}
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """
+    Converts a candle resolution or period string (e.g., '1h', '1wk', '3mo') to milliseconds.
+
+    Raises:
+        ValueError: If the string is not in '<number><unit>' form.
+    """
+    match = re.fullmatch(r'(\d+)(mo|wk|[mhdwMy])', timeframe)
+    if not match:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(match.group(1)) * _UNIT_MS[match.group(2)]
@@ -19,9 +19,15 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # --- Module Imports ---
 from core.stock_plotter import StockPlotter
-from ml.model_loader import predict_fibo_signal
-from core.signal_generator import generate_fibonacci_signal
+from ml.model import predict_fibo_signal
+from core.signal_generator import scan_watchlist
 from core.plot_fibonacci import FibonacciPlotter
+from core.data_sources import DataFetchError
+from core.result_cache import ResultKey, get_result_cache
+from core.pivots import swing_levels
+from core.crossings import UP, detect_crossings
+from core.live_feed import LiveFeed
+from core.metrics import PROVIDER_BYTES, PROVIDER_REQUESTS, PROVIDER_ROWS, enable as enable_metrics, get_registry
 
 # --- Streamlit Configuration ---
 st.set_page_config(page_title="📊 FiboBot Dashboard", layout="wide")
@@ -34,21 +40,107 @@ assets = {
 }
 
 # --- Caching Mechanism ---
-# Caches the signal generation to prevent excessive API calls and improve performance.
-# Data is refreshed every 600 seconds (10 minutes).
-@st.cache_data(ttl=600)
-def get_signal(symbol, exchange, screener):
-    return generate_fibonacci_signal(symbol, exchange, screener)
+# One process-wide result cache serves every session: candles + levels, signals and
+# predictions are keyed by (symbol, timeframe, range), expire with a per-timeframe TTL,
+# and concurrent requests for the same key share a single upstream computation.
+result_cache = get_result_cache()
+
+# All assets are scanned concurrently in one call; data is refreshed every 600 seconds (10 minutes).
+SIGNALS_TTL = 600
+
+def get_signals(watchlist):
+    def scan():
+        return {signal.symbol: signal.to_message() for signal in scan_watchlist(watchlist)}
+    return result_cache.get_or_compute(ResultKey("signals", watchlist, "1h", "1m"), scan, ttl=SIGNALS_TTL)
+
+def get_analysis(plotter, timeframe, data_range):
+    """
+    Returns the plotter's (shared, read-only) analysis: candles, levels and signal markers.
+    """
+    return result_cache.get_or_compute(ResultKey("analysis", plotter.symbol, timeframe, data_range), plotter.analyze)
+
+def get_prediction(df, symbol, timeframe, data_range):
+    """
+    AI signal for the analyzed candles; keyed by the last candle (time and still-forming close),
+    so a refetched analysis never shows a prediction computed from older candles.
+    """
+    last_candle = (int(df["Timestamp"].iloc[-1]), float(df["Close"].iloc[-1]))
+    return result_cache.get_or_compute(ResultKey("prediction", symbol, timeframe, (data_range, last_candle)),
+                                       lambda: predict_fibo_signal(df))
+
+def describe_last_breakout(df):
+    """
+    Summarizes the most recent breakout through the latest swing leg's Fibonacci levels, if any.
+    """
+    levels = swing_levels(df['High'].to_numpy(), df['Low'].to_numpy(), count=1)[0]
+    labels = list(levels.keys())
+    events = detect_crossings(df['Close'].to_numpy(), list(levels.values()))
+    if len(events) == 0:
+        return None
+
+    i, level_id, direction = events.index[-1], events.level_id[-1], events.direction[-1]
+    side = "BUY" if direction == UP else "SELL"
+    return f"🔔 Last breakout: {side} through {labels[level_id]} at {df['Datetime'].iloc[i]}"
+
+# --- Live Feed ---
+# One push-based websocket feed per URL, shared by every session. The panel re-renders
+# itself every second as a fragment, without re-running the page or polling the providers.
+@st.cache_resource
+def get_live_feed(url):
+    return LiveFeed(url).start()
+
+show_diagnostics = st.sidebar.checkbox("🩺 Diagnostics", value=False,
+                                       help="Per-stage latency, cache hit rates and provider traffic")
+
+# Stage timings and provider / cache counters are off unless FIBOBOT_METRICS is set; opening the
+# panel turns them on for this server process, whose registry every session shares
+if show_diagnostics:
+    enable_metrics()
+
+live_url = st.sidebar.text_input(
+    "🔴 Live feed (websocket)", value="",
+    help="e.g. ws://localhost:8765 from `python -m core.replay_server`; leave empty to disable",
+)
+
+if live_url:
+    feed = get_live_feed(live_url)
+
+    @st.fragment(run_every=1)
+    def live_panel():
+        status = "🟢 Connected" if feed.connected else f"🔴 Disconnected {feed.error or ''}"
+        st.caption(f"Live feed {live_url}: {status}")
+
+        rows = []
+        for symbol in feed.symbols:
+            candle = feed.latest(symbol)
+            events = feed.recent_events(symbol)
+            last = events[-1] if events else None
+            age = feed.age(symbol)
+            rows.append({
+                "Symbol": symbol,
+                "Close": candle.close if candle else None,
+                "Age (s)": round(age, 1) if age is not None else None,
+                "Last event": f"{last.kind} {last.level_label} @ {last.level_price:.4f}" if last else "",
+            })
+        if rows:
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+        else:
+            st.info("⏳ Waiting for live candles...")
+
+    live_panel()
+
+# Note: Removing dashes from symbols for compatibility with the signal generator
+signals = get_signals(tuple(
+    (symbol.replace("-", ""), exchange, screener) for symbol, exchange, screener in assets.values()
+))
 
 # --- Main Dashboard Loop ---
 # Iterate through each asset to display its section
 for name, (symbol, exchange, screener) in assets.items():
     st.subheader(name)
 
-    # Fetch and display the technical signal (Buy/Sell/Neutral)
-    # Note: Removing dashes from symbol for compatibility with the signal generator
-    signal = get_signal(symbol.replace("-", ""), exchange, screener)
-    st.text(signal)
+    # Display the technical signal (Buy/Sell/Neutral)
+    st.text(signals[symbol.replace("-", "")])
 
     # --- User Controls (Expander) ---
     with st.expander(f"⚙️ הגדרות תצוגת גרף ל-{name}"):
@@ -61,33 +153,85 @@ for name, (symbol, exchange, screener) in assets.items():
             loading_text = f"📡 טוען גרף עבור {symbol} עם תקופה {period} ורזולוציה {interval}..."
             st.write(loading_text)
 
-            df = None  # Initialize dataframe variable
-
             # 1. Handling Crypto Assets
             if screener == "crypto":
                 # Using FibonacciPlotter for crypto assets (e.g., binance pairs)
-                plotter = FibonacciPlotter(symbol=f"{symbol.replace('USDT', '/USDT')}", timeframe=interval)
-                plotter.plot()
-                df = plotter.fetch_data()
+                plotter = FibonacciPlotter(symbol=f"{symbol.replace('USDT', '/USDT')}", timeframe=interval, limit=500)
+                data_range = plotter.limit
 
             # 2. Handling US Stocks
             elif screener == "america":
                 # Using StockPlotter for US market assets (e.g., NASDAQ)
                 plotter = StockPlotter(symbol=symbol, period=period, interval=interval)
-                plotter.plot()
-                df = plotter.fetch_data()
+                data_range = period
 
             else:
                 st.error("❌ סוג נכס לא נתמך להצגת גרף")
                 continue
 
+            try:
+                analysis = get_analysis(plotter, interval, data_range)
+            except DataFetchError as e:
+                st.error(str(e))
+                continue
+            df = plotter.plot(analysis)
+
+            # --- Latest Breakout Summary ---
+            if df is not None and not df.empty:
+                breakout = describe_last_breakout(df)
+                if breakout:
+                    st.info(breakout)
+
             # --- AI Prediction Integration ---
             # If data is successfully fetched, run the ML model for prediction
             if df is not None and not df.empty:
                 try:
-                    ai_signal = predict_fibo_signal(df)
+                    ai_signal = get_prediction(df, symbol, interval, data_range)
                     st.success(f"🤖 AI Signal: {ai_signal}")
                 except Exception as e:
                     st.error(f"AI Prediction Error: {e}")
             else:
-                st.warning("לא ניתן לבצע חיזוי – הדאטה ריק.")
\ No newline at end of file
+                st.warning("לא ניתן לבצע חיזוי – הדאטה ריק.")
+
+# --- Diagnostics Panel ---
+# Rendered last so the timings include the charts and predictions of this run
+if show_diagnostics:
+    registry = get_registry()
+    st.subheader("🩺 Diagnostics")
+
+    stages = registry.stage_summary()
+    if stages:
+        st.caption("⏱️ Stage latency (stages may nest, e.g. analyze includes load_candles)")
+        st.dataframe(stages, use_container_width=True, hide_index=True)
+    else:
+        st.info("No timings recorded yet.")
+
+    caches = registry.cache_hit_rates()
+    if caches:
+        columns = st.columns(len(caches))
+        for column, (cache, counts) in zip(columns, sorted(caches.items())):
+            rate = counts["hit_rate"]
+            column.metric(f"🗄️ {cache} cache hit rate", f"{rate:.0%}" if rate is not None else "–",
+                          help=f"{int(counts['hits'])} hits / {int(counts['misses'])} misses")
+
+    requests = registry.counter_totals(PROVIDER_REQUESTS, by="provider")
+    rows = registry.counter_totals(PROVIDER_ROWS, by="provider")
+    received = registry.counter_totals(PROVIDER_BYTES, by="provider")
+    providers = sorted(set(requests) | set(rows) | set(received))
+    if providers:
+        st.caption("📡 Upstream providers")
+        st.dataframe([{"Provider": p, "Requests": int(requests.get(p, 0)), "Rows": int(rows.get(p, 0)),
+                       "KB received": round(received.get(p, 0) / 1024, 1)} for p in providers],
+                     use_container_width=True, hide_index=True)
+
+    stats = result_cache.stats()
+    st.caption(f"🧠 Result cache: {stats['entries']} entries, {stats['bytes'] / 2**20:.2f} / "
+               f"{stats['max_bytes'] / 2**20:.0f} MB, {stats['hits']} hits, {stats['misses']} misses, "
+               f"{stats['coalesced']} coalesced, {stats['evictions']} evictions")
+
+    export_prom, export_jsonl, reset = st.columns(3)
+    export_prom.download_button("⬇️ Prometheus", registry.to_prometheus(), file_name="fibobot_metrics.prom")
+    export_jsonl.download_button("⬇️ JSON lines", registry.to_jsonl(), file_name="fibobot_metrics.jsonl")
+    if reset.button("🧹 Reset metrics"):
+        registry.reset()
+        st.rerun()
@@ -1,35 +1,263 @@
 """
-🚀 Trading Signal Bot - Main Execution Script
+🚀 Trading Signal Bot - Headless Batch Scanner
 
-This script serves as the entry point for the trading bot.
-It utilizes the core logic to generate buy/sell signals based on Fibonacci retracements
-and visualizes the data for both Cryptocurrencies and Stock Market assets.
+This script serves as the command-line entry point for the trading bot.
+It reads a watchlist, fans the symbols out across a process pool and, for each one,
+loads candles (through the local candle cache), computes Fibonacci levels, proximity
+and breakout signals and the AI prediction. Results are written as JSON lines or CSV.
+
+It never imports Streamlit or Plotly, so it can run on servers and from cron.
+
+Usage:
+    python main.py --watchlist watchlist.csv --timeframe 1h --output results.jsonl
+    python main.py --watchlist watchlist.csv --format csv --output results.csv --workers 8
+    python main.py --watchlist watchlist.csv --metrics-out metrics.prom   # Per-stage timings (or .jsonl)
+
+Watchlist format (CSV, '#' starts a comment):
+    symbol,exchange,screener
+    XRPUSDT,BINANCE,crypto
+    QQQ,NASDAQ,america
+
+Exit codes:
+    0 - every symbol was scanned
+    1 - some symbols failed (see the 'error' field), or the AI prediction failed (see 'ml_error')
+    2 - invalid arguments / watchlist, or every symbol failed
 
 Author: Elinor Srur
 """
 
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
 # Importing core logic from the modular package
-from core.signal_generator import generate_fibonacci_signal
-from core.plot_fibonacci import plot_fibonacci_chart
+from core.crossings import UP, detect_crossings
+from core.data_sources import load_candles, resolve_source
+from core.metrics import enable as enable_metrics, get_registry, timed
+from core.pivots import DEFAULT_THRESHOLD, swing_levels
+from core.signal_generator import DEFAULT_TOLERANCE_RATIO, evaluate_fibonacci_signal
+
+EXIT_OK, EXIT_PARTIAL, EXIT_FAILED = 0, 1, 2
+
+# Used when no watchlist file is given
+DEFAULT_WATCHLIST = [
+    ("XRPUSDT", "BINANCE", "crypto"),
+    ("QQQ", "NASDAQ", "america"),
+]
+
+RESULT_FIELDS = [
+    "symbol", "exchange", "screener", "source", "timeframe", "bars", "timestamp",
+    "close", "high", "low", "swing_direction", "near_level", "level_label", "level_price", "confluence",
+    "last_cross_timestamp", "last_cross_level", "last_cross_direction",
+    "ai_prediction", "ai_probability", "error",
+]
+
+
+def read_watchlist(path):
+    """
+    Parses a 'symbol,exchange,screener' watchlist file (header line and '#' comments allowed).
+    """
+    entries = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if not row or row[0].strip().startswith("#"):
+                continue
+            row = [cell.strip() for cell in row]
+            if row[0].lower() == "symbol":
+                continue
+            if len(row) < 3:
+                raise ValueError(f"Invalid watchlist line (expected symbol,exchange,screener): {','.join(row)}")
+            entries.append((row[0], row[1], row[2]))
+    return entries
+
+
+def scan_symbol(entry, options):
+    """
+    Computes levels and signals for one watchlist entry. Returns (result dict, candles or None).
+    """
+    symbol, exchange, screener = entry
+    source, market_symbol = resolve_source(symbol, screener)
+    result = {"symbol": symbol, "exchange": exchange, "screener": screener,
+              "source": source, "timeframe": options["timeframe"]}
+
+    try:
+        df = load_candles(source, market_symbol, options["timeframe"],
+                          period=options["period"], limit=options["limit"])
+        df = df.dropna(subset=["Open", "High", "Low", "Close"])
+        if df.empty:
+            result["error"] = "No data found"
+            return result, None
+
+        # Levels of the recent confirmed ZigZag swing legs (whole-window range if none yet)
+        with timed("levels"):
+            grids = swing_levels(df["High"].to_numpy(), df["Low"].to_numpy(), count=3, threshold=options["threshold"])
+        levels = grids[0]
+        high, low = max(levels.values()), min(levels.values())
+        close = float(df["Close"].iloc[-1])
+        signal = evaluate_fibonacci_signal(symbol, exchange, screener, high, low, close, options["tolerance"],
+                                           levels=levels, older_levels=grids[1:])
+        result.update({
+            "bars": len(df), "timestamp": int(df["Timestamp"].iloc[-1]),
+            "close": close, "high": high, "low": low,
+            "swing_direction": "up" if levels["0.0%"] >= levels["100.0%"] else "down",
+            "near_level": signal.near_level, "level_label": signal.level_label, "level_price": signal.level_price,
+            "confluence": signal.confluence,
+        })
+
+        with timed("crossings"):
+            events = detect_crossings(df["Close"].to_numpy(), list(signal.levels.values()))
+        if len(events):
+            labels = list(signal.levels.keys())
+            result.update({
+                "last_cross_timestamp": int(df["Timestamp"].iloc[events.index[-1]]),
+                "last_cross_level": labels[events.level_id[-1]],
+                "last_cross_direction": "BUY" if events.direction[-1] == UP else "SELL",
+            })
+        return result, df
+    except Exception as e:
+        result["error"] = str(e)
+        return result, None
+
+
+def scan_chunk(args):
+    """
+    Worker entry point: scans a chunk of symbols and runs one batched model call for all of them.
+    """
+    entries, options = args
+    scanned = [scan_symbol(entry, options) for entry in entries]
+
+    frames = [(result, df) for result, df in scanned if df is not None]
+    if options["ml"] and frames:
+        try:
+            # Imported here so '--no-ml' runs never load scikit-learn
+            from ml.model import predict_many
+            probabilities = predict_many([df for _, df in frames], proba=True)
+            for (result, _), proba in zip(frames, probabilities):
+                result["ai_prediction"] = "rise" if proba >= 0.5 else "no rise"
+                result["ai_probability"] = round(float(proba), 4)
+        except Exception as e:
+            for result, _ in frames:
+                result["ai_prediction"] = None
+                result["ml_error"] = str(e)
+
+    return [result for result, _ in scanned]
+
+
+def scan_chunk_with_metrics(args):
+    """
+    Worker entry point for instrumented runs: returns the chunk's results and the worker's
+    metrics recorded for it (the worker registry is drained, so reused workers never double count).
+    """
+    enable_metrics()
+    rows = scan_chunk(args)
+    return rows, get_registry().drain()
+
+
+def run_scan(watchlist, options, workers=None):
+    """
+    Fans the watchlist out across a process pool in chunks and returns the results in input order.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(1, math.ceil(len(watchlist) / (workers * 4)))
+    chunks = [(watchlist[i:i + chunk_size], options) for i in range(0, len(watchlist), chunk_size)]
+
+    if workers == 1:
+        return [row for chunk in chunks for row in scan_chunk(chunk)]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if options.get("metrics"):
+            # Worker snapshots are merged into this process's registry
+            for rows, snapshot in pool.map(scan_chunk_with_metrics, chunks):
+                results.extend(rows)
+                get_registry().merge(snapshot)
+        else:
+            for rows in pool.map(scan_chunk, chunks):
+                results.extend(rows)
+    return results
+
+
+def write_results(results, output, fmt):
+    """
+    Writes results as JSON lines or CSV to a file path, or to stdout when output is '-'.
+    """
+    stream = sys.stdout if output == "-" else open(output, "w", newline="", encoding="utf-8")
+    try:
+        if fmt == "csv":
+            writer = csv.DictWriter(stream, fieldnames=RESULT_FIELDS + ["ml_error"], extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(results)
+        else:
+            for row in results:
+                stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Fibonacci scan of a watchlist.")
+    parser.add_argument("--watchlist", help="CSV file of symbol,exchange,screener (default: built-in assets)")
+    parser.add_argument("--timeframe", default="1h", help="Candle resolution, e.g. 1h, 4h, 1d (default: 1h)")
+    parser.add_argument("--limit", type=int, default=500, help="Number of candles when no --period is given")
+    parser.add_argument("--period", default=None, help="Range to analyze instead of --limit, e.g. 1mo")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE_RATIO,
+                        help="Proximity band as a fraction of price (default: 0.003)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="ZigZag reversal that confirms a swing pivot, as a fraction of price (default: 0.05)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default=None,
+                        help="Output format (default: from the output extension, else jsonl)")
+    parser.add_argument("--output", default="-", help="Output file ('-' for stdout)")
+    parser.add_argument("--no-ml", action="store_true", help="Skip AI predictions")
+    parser.add_argument("--metrics-out", default=None,
+                        help="Write per-stage timings and provider/cache counters: Prometheus text for "
+                             ".prom/.txt, JSON lines otherwise")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    try:
+        watchlist = read_watchlist(args.watchlist) if args.watchlist else DEFAULT_WATCHLIST
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read watchlist: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    if not watchlist:
+        print("❌ Watchlist is empty.", file=sys.stderr)
+        return EXIT_FAILED
+
+    fmt = args.format or ("csv" if args.output.endswith(".csv") else "jsonl")
+    options = {"timeframe": args.timeframe, "limit": args.limit, "period": args.period,
+               "tolerance": args.tolerance, "threshold": args.threshold, "ml": not args.no_ml,
+               "metrics": bool(args.metrics_out)}
+    if args.metrics_out:
+        enable_metrics()
+
+    with timed("run_scan"):
+        results = run_scan(watchlist, options, workers=args.workers)
+    write_results(results, args.output, fmt)
+
+    if args.metrics_out:
+        try:
+            get_registry().write(args.metrics_out)
+        except OSError as e:
+            print(f"⚠️ Could not write metrics: {e}", file=sys.stderr)
+
+    failed = sum(1 for row in results if row.get("error"))
+    ml_failed = sum(1 for row in results if row.get("ml_error"))
+    print(f"✅ Scanned {len(results) - failed}/{len(results)} symbols.", file=sys.stderr)
+    if ml_failed:
+        print(f"⚠️ AI prediction failed for {ml_failed} symbols (see the 'ml_error' field).", file=sys.stderr)
+    if failed == len(results):
+        return EXIT_FAILED
+    return EXIT_PARTIAL if failed or ml_failed else EXIT_OK
+
 
 if __name__ == "__main__":
-    print("🚀 Starting Trading Bot Analysis...\n")
-
-    # --- 1. Cryptocurrency Analysis ---
-    # Analyzing XRP/USDT pair using Binance exchange data
-    print("🔍 XRPUSDT Analysis:")
-    # Generates signal (Buy/Sell/Neutral) based on technical indicators
-    print(generate_fibonacci_signal("XRPUSDT", "BINANCE"))
-
-    # --- 2. Stock Market Analysis ---
-    # Analyzing NASDAQ QQQ ETF using the American screener
-    print("\n🔍 NASDAQ (QQQ) Analysis:")
-    print(generate_fibonacci_signal("QQQ", "NASDAQ", screener="america"))
-
-    # --- 3. Visualization ---
-    # Plotting the Fibonacci charts for visual confirmation
-    print("\n📊 Generating Charts...")
-    plot_fibonacci_chart("XRP-USD")  # Plot Crypto chart
-    plot_fibonacci_chart("QQQ")      # Plot Stock chart
-
-    print("\n✅ Analysis Complete.")
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# ml/features.py
+import numpy as np
+from core.fibonacci_utils import FIB_LABELS, rolling_fibonacci_levels
+from core.pivots import active_legs, average_true_range, swing_grids, zigzag_pivots
+
+# Swing window (bars) used for the rolling Fibonacci grid, and return horizons (bars)
+FEATURE_WINDOW = 100
+RETURN_HORIZONS = (1, 3, 6, 12, 24)
+# ZigZag pivots confirm after a reversal of PIVOT_ATR_MULTIPLE x ATR(PIVOT_ATR_PERIOD), so
+# swing legs adapt to each symbol's volatility and timeframe
+PIVOT_ATR_PERIOD = 14
+PIVOT_ATR_MULTIPLE = 3.0
+# Bars given to the pivot detector at inference; its state converges after the first pivots,
+# so this keeps inference legs identical to the ones seen when training on the full series
+PIVOT_LOOKBACK = 500
+# Label: does the close rise within TARGET_HORIZON bars
+TARGET_HORIZON = 3
+
+# Feature schema shared by training and inference; a stored model must match it exactly
+FEATURE_COLUMNS = (
+    [f"dist_{label}" for label in FIB_LABELS]
+    + ["swing_pos"]
+    + [f"ret_{h}" for h in RETURN_HORIZONS]
+    + ["leg_dir", "leg_retrace", "leg_age"]
+)
+
+def compute_feature_matrix(high, low, close, window=FEATURE_WINDOW):
+    """
+    Point-in-time features for every bar of one series, computed as whole-array operations.
+
+    Row t only uses bars up to and including t:
+    - dist_<level>: relative distance of the close to each level of the rolling swing grid
+    - swing_pos: position of the close inside the rolling swing range (0 = low, 1 = high)
+    - ret_<h>: close-to-close return over the last h bars
+    - leg_dir / leg_retrace / leg_age: direction (+1 up, -1 down) of the latest confirmed
+      ZigZag swing leg, how far the close has retraced it (0 = at the leg's end, 1 = back at
+      its start) and the bars since its end pivot (in units of `window`)
+
+    Args:
+        high, low, close (array-like): Price arrays of equal length.
+        window (int): Rolling swing window in bars.
+
+    Returns:
+        np.ndarray: Shape (bars, len(FEATURE_COLUMNS)); rows without enough history contain NaN.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+
+    grid = rolling_fibonacci_levels(high, low, window)
+    swing_high, swing_low = grid[:, 0], grid[:, -1]
+
+    features = np.full((n, len(FEATURE_COLUMNS)), np.nan)
+    n_levels = grid.shape[1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        features[:, :n_levels] = close[:, None] / grid - 1
+        span = swing_high - swing_low
+        features[:, n_levels] = np.where(span > 0, (close - swing_low) / span, 0.5)
+
+    for k, h in enumerate(RETURN_HORIZONS):
+        features[h:, n_levels + 1 + k] = close[h:] / close[:-h] - 1
+
+    features[:window - 1, n_levels] = np.nan
+
+    # Pivots are only used from the bar that confirmed them, so these stay point-in-time
+    atr = average_true_range(high, low, close, PIVOT_ATR_PERIOD)
+    grids = swing_grids(zigzag_pivots(high, low, atr=atr, atr_multiple=PIVOT_ATR_MULTIPLE))
+    leg = active_legs(grids, n, count=1)[:, 0]
+    known = leg >= 0
+    col = n_levels + 1 + len(RETURN_HORIZONS)
+    if known.any():
+        ids = leg[known]
+        direction = grids.direction[ids]
+        origin = np.where(direction > 0, grids.high[ids], grids.low[ids])
+        span = grids.high[ids] - grids.low[ids]
+        features[known, col] = direction
+        with np.errstate(divide="ignore", invalid="ignore"):
+            features[known, col + 1] = np.where(span > 0, (origin - close[known]) * direction / span, 0.0)
+        features[known, col + 2] = (np.flatnonzero(known) - grids.end[ids]) / window
+    return features
+
+def compute_labels(close, horizon=TARGET_HORIZON):
+    """
+    1 if the close `horizon` bars ahead is higher than the current close, else 0.
+    The last `horizon` bars have no label and are NaN.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    labels = np.full(len(close), np.nan)
+    labels[:-horizon] = (close[horizon:] > close[:-horizon]).astype(float)
+    return labels
+
+def min_history(window=FEATURE_WINDOW):
+    """Number of bars needed for a complete feature row."""
+    return max(window, max(RETURN_HORIZONS) + 1)
+
+def build_feature_matrix(frames, window=FEATURE_WINDOW):
+    """
+    Builds the inference feature matrix for many symbols at once.
+
+    Only the trailing `max(min_history(window), PIVOT_LOOKBACK)` bars of each frame are used.
+
+    Args:
+        frames (list): One candle series per symbol: OHLCV DataFrames, or anything indexable
+            by column name such as a core.ring_store.CandleRing (read through zero-copy views).
+        window (int): Rolling swing window in bars.
+
+    Returns:
+        np.ndarray: Shape (len(frames), len(FEATURE_COLUMNS)), one row per frame
+            describing its latest candle.
+    """
+    tail = max(min_history(window), PIVOT_LOOKBACK)
+    features = np.empty((len(frames), len(FEATURE_COLUMNS)))
+    for i, series in enumerate(frames):
+        high, low, close = (np.asarray(series[col])[-tail:] for col in ("High", "Low", "Close"))
+        features[i] = compute_feature_matrix(high, low, close, window)[-1]
+    return features
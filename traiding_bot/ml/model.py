@@ -1,21 +1,131 @@
-# ml/model_loader.py
+# ml/model.py
+import os
+import threading
 import joblib
+import numpy as np
 import pandas as pd
-from core.fibonacci_utils import calculate_fibonacci_levels
+from core.metrics import CACHE_REQUESTS, inc, timed
+from ml.features import FEATURE_COLUMNS, FEATURE_WINDOW, build_feature_matrix
 
-model = joblib.load("ml/fibo_model.pkl")
+# Resolved relative to this file, so loading works from any working directory
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fibo_model.pkl")
+
+class ModelSchemaError(RuntimeError):
+    """Raised when the stored model was trained on a different feature schema."""
+
+class ModelRegistry:
+    """
+    Loads the trained model lazily on first use and keeps it for the life of the process.
+
+    The registry reloads automatically when the model file changes on disk (e.g. after
+    retraining) and validates the stored feature schema against FEATURE_COLUMNS.
+    Model arrays are memory-mapped, so worker processes share the same pages.
+    """
+
+    def __init__(self, path=MODEL_PATH, feature_columns=FEATURE_COLUMNS, feature_window=FEATURE_WINDOW):
+        self.path = path
+        self.feature_columns = list(feature_columns)
+        self.feature_window = feature_window
+        self._model = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _validate(self, model, stored_columns, stored_window=None):
+        if stored_window is not None and stored_window != self.feature_window:
+            raise ModelSchemaError(
+                f"Model at {self.path} was trained with a {stored_window}-bar swing window, "
+                f"current schema uses {self.feature_window}. Retrain with ml/trainer.py."
+            )
+        if stored_columns is None:
+            stored_columns = getattr(model, "feature_names_in_", None)
+        if stored_columns is not None and list(stored_columns) != self.feature_columns:
+            raise ModelSchemaError(
+                f"Model at {self.path} expects features {list(stored_columns)}, "
+                f"current schema is {self.feature_columns}. Retrain with ml/trainer.py."
+            )
+
+    def get(self):
+        """
+        Returns the loaded model, loading (or reloading) it if needed.
+        """
+        mtime = os.path.getmtime(self.path)
+        if self._model is not None and mtime == self._mtime:
+            inc(CACHE_REQUESTS, cache='model', result='hit')
+            return self._model
+
+        with self._lock:
+            if self._model is None or mtime != self._mtime:
+                inc(CACHE_REQUESTS, cache='model', result='miss')
+                with timed("model_load"):
+                    stored = joblib.load(self.path, mmap_mode="r")
+                # The trainer stores {"model": ..., "feature_columns": [...], ...}; older files hold the bare estimator
+                if isinstance(stored, dict):
+                    model = stored["model"]
+                    self._validate(model, stored.get("feature_columns"), stored.get("feature_window"))
+                else:
+                    model = stored
+                    self._validate(model, None)
+                self._model, self._mtime = model, mtime
+        return self._model
+
+    def predict(self, features):
+        return self.get().predict(self._as_frame(features))
+
+    def predict_proba(self, features):
+        return self.get().predict_proba(self._as_frame(features))
+
+    def rise_probability(self, features):
+        """
+        Probability of class 1 (rise) per row, located via the model's classes_;
+        zero when the model was trained without any rise.
+        """
+        model = self.get()
+        proba = model.predict_proba(self._as_frame(features))
+        rise = np.flatnonzero(model.classes_ == 1)
+        return proba[:, rise[0]] if len(rise) else np.zeros(len(proba))
+
+    def _as_frame(self, features):
+        # One named frame per batch keeps sklearn's feature-name check happy
+        return pd.DataFrame(np.asarray(features, dtype=float), columns=self.feature_columns)
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry():
+    """
+    Returns the process-wide ModelRegistry (the model itself loads on first prediction).
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
+
+def format_prediction(prediction):
+    return "📈 AI predicts rise" if prediction == 1 else "📉 AI predicts no rise"
 
 def extract_features_for_prediction(latest_df):
-    high = latest_df["High"].max()
-    low = latest_df["Low"].min()
-    fibo_levels = calculate_fibonacci_levels(high, low)
+    return pd.DataFrame(build_feature_matrix([latest_df]), columns=FEATURE_COLUMNS)
 
-    price_diff = latest_df["Close"].iloc[-1] - latest_df["Close"].iloc[-2]
-    above_0_618 = latest_df["Close"].iloc[-1] > fibo_levels["0.618"]
+def predict_many(frames, proba=False):
+    """
+    Runs one batched inference call for many symbols.
 
-    return pd.DataFrame([[price_diff, above_0_618]], columns=["price_diff", "above_0.618"])
+    Args:
+        frames (list): OHLCV DataFrames or CandleRings, one per symbol.
+        proba (bool): Return the probability of a rise instead of labels.
+
+    Returns:
+        np.ndarray: Predicted labels (N,) or rise probabilities (N,).
+    """
+    if len(frames) == 0:
+        return np.empty(0)
+    registry = get_registry()
+    with timed("features"):
+        features = build_feature_matrix(frames, registry.feature_window)
+    with timed("model_predict"):
+        return registry.rise_probability(features) if proba else registry.predict(features)
 
 def predict_fibo_signal(latest_df):
-    features = extract_features_for_prediction(latest_df)
-    prediction = model.predict(features)[0]
-    return "📈 AI predicts rise" if prediction == 1 else "📉 AI predicts no rise"
+    prediction = predict_many([latest_df])[0]
+    return format_prediction(prediction)
@@ -1,42 +1,210 @@
 # ml/trainer.py
+import argparse
+import glob
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 import joblib
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from core.fibonacci_utils import calculate_fibonacci_levels
-import ccxt
+from sklearn.model_selection import GridSearchCV, TimeSeriesSplit
+from core.data_sources import load_candles
+from core.timeframes import timeframe_to_ms
+from ml.features import (FEATURE_COLUMNS, FEATURE_WINDOW, PIVOT_LOOKBACK, TARGET_HORIZON,
+                         compute_feature_matrix, compute_labels, min_history)
+from ml.model import MODEL_PATH
+
+# Feature matrices are cached here between runs, one file per symbol / timeframe / schema,
+# extended in place with the rows of newly closed candles
+FEATURE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "features")
+
+DEFAULT_SYMBOLS = ["XRP/USDT"]
+
+# Hyperparameters searched with walk-forward validation
+PARAM_GRID = {
+    "n_estimators": [100, 300],
+    "max_depth": [None, 8],
+    "min_samples_leaf": [1, 20],
+}
 
 def fetch_data(symbol='XRP/USDT', timeframe='1h', limit=500):
-    exchange = ccxt.binance()
-    ohlcv = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
-    df = pd.DataFrame(ohlcv, columns=['Timestamp', 'Open', 'High', 'Low', 'Close', 'Volume'])
-    df['Datetime'] = pd.to_datetime(df['Timestamp'], unit='ms')
-    return df
+    # Served from the shared candle cache; only new candles hit the exchange
+    return load_candles('binance', symbol, timeframe, limit=limit)
+
+def build_features(df, window=FEATURE_WINDOW, horizon=TARGET_HORIZON):
+    """
+    Rolling, point-in-time features and labels for a single OHLCV frame.
+
+    Returns:
+        tuple: (features DataFrame, labels Series) restricted to rows that have
+            complete features and a known label.
+    """
+    features = compute_feature_matrix(df["High"].to_numpy(), df["Low"].to_numpy(), df["Close"].to_numpy(), window)
+    labels = compute_labels(df["Close"].to_numpy(), horizon)
+
+    valid = ~np.isnan(features).any(axis=1) & ~np.isnan(labels)
+    X = pd.DataFrame(features[valid], columns=FEATURE_COLUMNS, index=df.index[valid])
+    y = pd.Series(labels[valid].astype(int), index=df.index[valid], name="target")
+    return X, y
+
+def _feature_cache_path(symbol, timeframe, window, horizon):
+    schema = hashlib.sha1(",".join(FEATURE_COLUMNS).encode()).hexdigest()[:10]
+    safe_symbol = symbol.replace("/", "_")
+    return os.path.join(FEATURE_CACHE_DIR, f"{safe_symbol}_{timeframe}_w{window}_h{horizon}_{schema}.npz")
+
+def _empty_dataset():
+    return np.empty((0, len(FEATURE_COLUMNS))), np.empty(0, dtype=int), np.empty(0, dtype=np.int64)
+
+def _read_feature_cache(path):
+    try:
+        with np.load(path) as cached:
+            return cached["X"], cached["y"], cached["timestamps"]
+    except (FileNotFoundError, ValueError, KeyError, OSError):
+        return _empty_dataset()
+
+def build_symbol_dataset(args):
+    """
+    Loads one symbol's candles and returns (X, y, timestamps), reusing the cached feature matrix.
+
+    Cached rows (all with known labels) are kept; features are computed only for the candles
+    after the last cached row, on a tail long enough (rolling window, returns and pivot
+    state) to give the same values as a full-series computation. Rows older than the
+    loaded candles are dropped and the cache file is overwritten in place. The still-forming
+    candle is left out, so no row is labelled (and persisted) from a close that can change.
+    """
+    symbol, timeframe, limit, window, horizon = args
+    df = fetch_data(symbol, timeframe=timeframe, limit=limit)
+    closed_until = int(time.time() * 1000) - timeframe_to_ms(timeframe)
+    df = df[df["Timestamp"] <= closed_until]
+    if len(df) <= window + horizon:
+        return _empty_dataset()
+
+    path = _feature_cache_path(symbol, timeframe, window, horizon)
+    X, y, timestamps = _read_feature_cache(path)
+    candle_times = df["Timestamp"].to_numpy()
 
-def build_features(df):
-    high = df["High"].max()
-    low = df["Low"].min()
-    fibo_levels = calculate_fibonacci_levels(high, low)
+    # First candle without a cached row; rows are final once their label is known (len - horizon)
+    start = int(np.searchsorted(candle_times, timestamps[-1], side="right")) if len(timestamps) else 0
+    changed = start < len(df) - horizon
+    if changed:
+        first = max(0, start - max(min_history(window), PIVOT_LOOKBACK))
+        X_new, y_new = build_features(df.iloc[first:], window, horizon)
+        new_times = df.loc[X_new.index, "Timestamp"].to_numpy()
+        fresh = new_times > timestamps[-1] if len(timestamps) else np.ones(len(new_times), dtype=bool)
+        X = np.concatenate([X, X_new.to_numpy()[fresh]])
+        y = np.concatenate([y, y_new.to_numpy()[fresh]])
+        timestamps = np.concatenate([timestamps, new_times[fresh]])
 
-    df["price_diff"] = df["Close"].diff()
-    df["above_0.618"] = df["Close"] > fibo_levels["0.618"]
-    df["target"] = df["Close"].shift(-3) > df["Close"]  # אם עולה תוך 3 צעדים
+    in_range = timestamps >= candle_times[0]
+    if not in_range.all():
+        X, y, timestamps = X[in_range], y[in_range], timestamps[in_range]
+        changed = True
 
-    features = df[["price_diff", "above_0.618"]].dropna().astype(float)
-    labels = df["target"].dropna().astype(int)
+    if changed:
+        os.makedirs(FEATURE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, X=X, y=y, timestamps=timestamps)
+        os.replace(tmp_path, path)
+        # Files of the former per-candle naming scheme are never read again
+        for stale in glob.glob(glob.escape(path[:-len(".npz")]) + "_*.npz"):
+            os.remove(stale)
+    return X, y, timestamps
 
-    return features, labels[:len(features)]
+def build_dataset(symbols, timeframe='1h', limit=5000, window=FEATURE_WINDOW, horizon=TARGET_HORIZON, processes=None):
+    """
+    Builds the training set for many symbols in parallel, ordered by candle time.
 
-def train_and_save_model():
-    df = fetch_data()
-    X, y = build_features(df)
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
+    Rows of different symbols share timestamps, so walk-forward splits must be cut on
+    the returned timestamps (see WalkForwardSplit) rather than on row positions.
 
-    model = RandomForestClassifier()
-    model.fit(X_train, y_train)
+    Returns:
+        tuple: (X DataFrame, y Series, timestamps np.ndarray), one timestamp per row.
+    """
+    tasks = [(symbol, timeframe, limit, window, horizon) for symbol in symbols]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        parts = list(pool.map(build_symbol_dataset, tasks))
 
-    joblib.dump(model, "ml/fibo_model.pkl")
-    print("✅ Model trained and saved to ml/fibo_model.pkl")
+    X = np.concatenate([p[0] for p in parts])
+    y = np.concatenate([p[1] for p in parts])
+    timestamps = np.concatenate([p[2] for p in parts])
+
+    order = np.argsort(timestamps, kind="stable")
+    return pd.DataFrame(X[order], columns=FEATURE_COLUMNS), pd.Series(y[order], name="target"), timestamps[order]
+
+class WalkForwardSplit:
+    """
+    Expanding-window splitter over unique candle timestamps (scikit-learn CV interface).
+
+    Folds are cut on timestamp boundaries, so all symbols' rows of one candle fall on the
+    same side, and `gap` whole timestamps are skipped between train and test. With
+    gap = label horizon, no training label looks at a close inside the test window.
+    Timestamps are passed as `groups`; without them every row is its own timestamp.
+    """
+
+    def __init__(self, n_splits=5, gap=0):
+        self.n_splits = n_splits
+        self.gap = gap
+
+    def get_n_splits(self, X=None, y=None, groups=None):
+        return self.n_splits
+
+    def split(self, X, y=None, groups=None):
+        times = np.arange(len(X)) if groups is None else np.asarray(groups)
+        unique, inverse = np.unique(times, return_inverse=True)
+        for train, test in TimeSeriesSplit(n_splits=self.n_splits, gap=self.gap).split(unique):
+            yield (np.flatnonzero(inverse <= train[-1]),
+                   np.flatnonzero((inverse >= test[0]) & (inverse <= test[-1])))
+
+def walk_forward_search(X, y, timestamps=None, param_grid=PARAM_GRID, n_splits=5, horizon=TARGET_HORIZON, n_jobs=-1):
+    """
+    Hyperparameter search with walk-forward (expanding window) validation.
+
+    Folds are cut on candle timestamps with a gap of `horizon` candles between train and
+    test, so training labels (which look `horizon` bars ahead) never reach into the test
+    window, even with many symbols interleaved. Candidate fits run in parallel across
+    `n_jobs` workers.
+
+    Args:
+        timestamps (array-like, optional): Candle time of every row (from build_dataset);
+            omitted for a single series, where rows are already one per candle.
+    """
+    search = GridSearchCV(
+        RandomForestClassifier(random_state=42),
+        param_grid,
+        cv=WalkForwardSplit(n_splits=n_splits, gap=horizon),
+        scoring="balanced_accuracy",
+        n_jobs=n_jobs,
+        refit=True,
+    )
+    search.fit(X, y, groups=timestamps)
+    return search
+
+def train_and_save_model(symbols=DEFAULT_SYMBOLS, timeframe='1h', limit=5000, n_splits=5, n_jobs=-1, processes=None):
+    X, y, timestamps = build_dataset(symbols, timeframe=timeframe, limit=limit, processes=processes)
+    search = walk_forward_search(X, y, timestamps, n_splits=n_splits, n_jobs=n_jobs)
+
+    # Stored with its feature schema so the registry can reject stale models
+    joblib.dump({
+        "model": search.best_estimator_,
+        "feature_columns": FEATURE_COLUMNS,
+        "feature_window": FEATURE_WINDOW,
+        "target_horizon": TARGET_HORIZON,
+        "params": search.best_params_,
+        "cv_score": search.best_score_,
+    }, MODEL_PATH)
+    print(f"🔎 Best params: {search.best_params_} (walk-forward balanced accuracy {search.best_score_:.3f})")
+    print(f"✅ Model trained on {len(X)} rows from {len(symbols)} symbols and saved to {MODEL_PATH}")
 
 if __name__ == "__main__":
-    train_and_save_model()
+    parser = argparse.ArgumentParser(description="Train the Fibonacci trend model.")
+    parser.add_argument("--symbols", nargs="+", default=DEFAULT_SYMBOLS)
+    parser.add_argument("--timeframe", default="1h")
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--splits", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    train_and_save_model(args.symbols, args.timeframe, args.limit, args.splits, args.n_jobs, args.processes)